@@ -26,14 +26,17 @@ class BasePluginException(Exception):
     ) -> None:
         """Initialize the exception.
 
-        Add message bar to the QGIS UI about the exception and log the error
-        before proceeding as with any other exception.
+        Exception only carries the error data. Message bar is shown and
+        flight recorder is dumped only when the exception is reported with
+        report_error or it is left uncaught.
 
         Args:
             message (str): Exception message.
-            duration (int | None, optional): Duration of time that the
-                message bar will be show in seconds. Use None to keep until
-                cleared by user. Defaults to None.
+            bar_msg (dict[str, Any] | None, optional): Message bar data with
+                optional keys "message" (shown instead of the exception
+                message), "level" (MessageLevel, defaults to ERROR) and
+                "duration" (time in seconds that the message bar is shown,
+                None keeps it until cleared by user). Defaults to None.
         """
         if message is None:
             message = self.default_message
@@ -46,15 +49,15 @@ class BasePluginException(Exception):
 
 
 class GenericException(BasePluginException):
-    default_msg = translate("exceptions", "genericError")
+    default_message = translate("exceptions", "genericError")
 
 
 class UnkownException(BasePluginException):
-    default_msg = translate("exceptions", "unkownError")
+    default_message = translate("exceptions", "unkownError")
 
 
 class NetworkException(BasePluginException):
-    default_msg = translate("exceptions", "networkError")
+    default_message = translate("exceptions", "networkError")
 
     def __init__(
         self,
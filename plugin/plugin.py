@@ -1,25 +1,41 @@
-import os
 from collections.abc import Callable
 
+from qgis.core import QgsApplication
 from qgis.PyQt.QtCore import (
     QCoreApplication,
     QTranslator,
 )
-from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import QAction, QWidget
 from qgis.utils import iface
 
+from plugin.processing.provider import Provider
 from plugin.ui.example_dialog import ExampleDialog
+from plugin.utilities.error_reporter import (
+    install_error_reporting,
+    uninstall_error_reporting,
+)
 from plugin.utilities.i18n import setup_translations
 from plugin.utilities.logger import (
     get_plugin_logger,
     init_logger,
     remove_logger,
 )
-from plugin.utilities.resources import (
-    get_plugin_name,
-    get_resource_path,
+from plugin.utilities.network_session import (
+    close_network_session,
+    get_network_session,
+)
+from plugin.utilities.process_pool import shutdown_process_pool
+from plugin.utilities.refresh_scheduler import (
+    install_refresh_scheduler,
+    uninstall_refresh_scheduler,
+)
+from plugin.utilities.resource_registry import (
+    get_icon,
+    register_resource_bundle,
+    unregister_resource_bundle,
 )
+from plugin.utilities.resources import get_plugin_name
+from plugin.utilities.settings import get_settings, refresh_settings
 
 LOG = get_plugin_logger()
 
@@ -29,10 +45,10 @@ class Plugin:
 
     def __init__(self) -> None:
         init_logger(get_plugin_name())
+        install_error_reporting()
+        register_resource_bundle()
 
-        plugin_dir = os.path.dirname(__file__)
-
-        translation_file_path = setup_translations(plugin_dir)
+        translation_file_path = setup_translations()
         if translation_file_path:
             self.translator = QTranslator()
             self.translator.load(translation_file_path)
@@ -40,6 +56,7 @@ class Plugin:
 
         self.actions: list[QAction] = []
         self.menu = get_plugin_name()
+        self.provider: Provider | None = None
 
     def add_action(
         self,
@@ -58,7 +75,9 @@ class Plugin:
         """Add a toolbar icon to the toolbar.
 
         :param icon_path: Path to the icon for this action. Can be a resource
-            path (e.g. ':/plugins/foo/bar.png') or a normal file system path.
+            key relative to plugin directory (e.g. 'resources/icons/dog.png'),
+            a resource path (e.g. ':/plugins/foo/bar.png') or a normal file
+            system path. Icons are cached by the path.
 
         :param text: Text that should be shown in menu items for this action.
 
@@ -86,8 +105,7 @@ class Plugin:
         :rtype: QAction
         """
 
-        icon = QIcon(icon_path)
-        action = QAction(icon, text, parent)
+        action = QAction(get_icon(icon_path), text, parent)
         action.setObjectName(name)
         action.triggered.connect(callback)
         action.setEnabled(enabled_flag)
@@ -108,16 +126,28 @@ class Plugin:
 
         return action
 
+    def initProcessing(self) -> None:
+        """Register Processing provider. Called also by qgis_process."""
+        if self.provider is not None:
+            return
+
+        self.provider = Provider()
+        QgsApplication.processingRegistry().addProvider(self.provider)
+
     def initGui(self) -> None:
         """Create the menu entries and toolbar icons inside the QGIS GUI."""
+        self.initProcessing()
+
         self.toolbar = iface.addToolBar(get_plugin_name())
         self.toolbar.setObjectName(get_plugin_name())
 
-        action_icon = str(get_resource_path("icons/dog.png"))
+        iface.optionsChanged.connect(refresh_settings)
+        install_refresh_scheduler()
+        get_network_session().prewarm(get_settings().prewarm_hosts)
 
         self.toolbar.addAction(
             self.add_action(
-                action_icon,
+                "resources/icons/dog.png",
                 text=get_plugin_name(),
                 name="showExampleDialog",
                 callback=self.run,
@@ -132,11 +162,23 @@ class Plugin:
 
     def unload(self) -> None:
         """Removes the plugin menu item and icon from QGIS GUI."""
+        iface.optionsChanged.disconnect(refresh_settings)
+
         for action in self.actions:
             iface.removePluginMenu(get_plugin_name(), action)
             iface.removeToolBarIcon(action)
             iface.unregisterMainWindowAction(action)
 
+        if self.provider is not None:
+            QgsApplication.processingRegistry().removeProvider(self.provider)
+            self.provider = None
+
+        close_network_session()
+        shutdown_process_pool()
+        uninstall_refresh_scheduler()
+        unregister_resource_bundle()
+        uninstall_error_reporting()
+
         remove_logger(get_plugin_name())
 
     def run(self) -> None:
@@ -0,0 +1,74 @@
+from pathlib import Path
+from typing import Any
+
+from qgis.core import (
+    QgsProcessingAlgorithm,
+    QgsProcessingContext,
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProcessingParameterFileDestination,
+    QgsProcessingParameterString,
+)
+
+from plugin.exceptions import NetworkException
+from plugin.utilities import network
+from plugin.utilities.i18n import translate
+from plugin.utilities.rate_limiter import RequestPriority
+
+
+class FetchUrlAlgorithm(QgsProcessingAlgorithm):
+    """Download content of a URL into a file with plugin network stack."""
+
+    URL = "URL"
+    OUTPUT = "OUTPUT"
+
+    def name(self) -> str:
+        return "fetchurl"
+
+    def displayName(self) -> str:
+        return translate("processing", "Fetch URL to file")
+
+    def shortHelpString(self) -> str:
+        return translate(
+            "processing",
+            "Downloads the URL into a file. Requests are rate limited and "
+            "identical concurrent requests share one download.",
+        )
+
+    def createInstance(self) -> "FetchUrlAlgorithm":
+        return FetchUrlAlgorithm()
+
+    def initAlgorithm(
+        self,
+        config: dict[str, Any] | None = None,  # noqa: ARG002
+    ) -> None:
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.URL, translate("processing", "URL")
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFileDestination(
+                self.OUTPUT, translate("processing", "Output file")
+            )
+        )
+
+    def processAlgorithm(
+        self,
+        parameters: dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> dict[str, Any]:
+        url = self.parameterAsString(parameters, self.URL, context)
+        output = self.parameterAsFileOutput(parameters, self.OUTPUT, context)
+
+        feedback.pushInfo(url)
+
+        try:
+            content = network.get(url, priority=RequestPriority.BACKGROUND)
+        except NetworkException as e:
+            raise QgsProcessingException(str(e)) from e
+
+        Path(output).write_bytes(content)
+
+        return {self.OUTPUT: output}
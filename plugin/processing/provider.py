@@ -0,0 +1,30 @@
+from qgis.core import QgsProcessingProvider
+from qgis.PyQt.QtGui import QIcon
+
+from plugin.processing.fetch_url_algorithm import FetchUrlAlgorithm
+from plugin.processing.transform_layer_algorithm import (
+    TransformLayerAlgorithm,
+)
+from plugin.utilities.resource_registry import get_icon
+from plugin.utilities.resources import get_plugin_name
+
+
+class Provider(QgsProcessingProvider):
+    """Processing provider for the plugin algorithms.
+
+    Algorithms can be run from the Processing toolbox, batch processing
+    interface, models and qgis_process.
+    """
+
+    def loadAlgorithms(self) -> None:
+        self.addAlgorithm(FetchUrlAlgorithm())
+        self.addAlgorithm(TransformLayerAlgorithm())
+
+    def id(self) -> str:
+        return get_plugin_name().lower()
+
+    def name(self) -> str:
+        return get_plugin_name()
+
+    def icon(self) -> QIcon:
+        return get_icon("resources/icons/dog.png")
@@ -0,0 +1,114 @@
+from typing import Any
+
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCsException,
+    QgsFeature,
+    QgsFeatureSink,
+    QgsProcessing,
+    QgsProcessingAlgorithm,
+    QgsProcessingContext,
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProcessingParameterFeatureSink,
+    QgsProcessingParameterFeatureSource,
+)
+
+from plugin.utilities.i18n import translate
+from plugin.utilities.transform import TARGET_CRS_ID, BulkTransformer
+
+
+class TransformLayerAlgorithm(QgsProcessingAlgorithm):
+    """Reproject vector layer to EPSG:3067 with bulk transformation."""
+
+    INPUT = "INPUT"
+    OUTPUT = "OUTPUT"
+
+    def name(self) -> str:
+        return "transformlayer"
+
+    def displayName(self) -> str:
+        return translate("processing", "Reproject layer to EPSG:3067")
+
+    def shortHelpString(self) -> str:
+        return translate(
+            "processing",
+            "Reprojects features into ETRS-TM35FIN (EPSG:3067) in batches "
+            "with a single vectorized transformation per batch.",
+        )
+
+    def createInstance(self) -> "TransformLayerAlgorithm":
+        return TransformLayerAlgorithm()
+
+    def initAlgorithm(
+        self,
+        config: dict[str, Any] | None = None,  # noqa: ARG002
+    ) -> None:
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.INPUT,
+                translate("processing", "Input layer"),
+                [QgsProcessing.TypeVectorAnyGeometry],
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                self.OUTPUT, translate("processing", "Reprojected")
+            )
+        )
+
+    def processAlgorithm(
+        self,
+        parameters: dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> dict[str, Any]:
+        source = self.parameterAsSource(parameters, self.INPUT, context)
+        if source is None:
+            raise QgsProcessingException(
+                self.invalidSourceError(parameters, self.INPUT)
+            )
+
+        destination_crs = QgsCoordinateReferenceSystem(TARGET_CRS_ID)
+        sink, destination_id = self.parameterAsSink(
+            parameters,
+            self.OUTPUT,
+            context,
+            source.fields(),
+            source.wkbType(),
+            destination_crs,
+        )
+        if sink is None:
+            raise QgsProcessingException(
+                self.invalidSinkError(parameters, self.OUTPUT)
+            )
+
+        transformer = BulkTransformer(
+            source.sourceCrs(),
+            destination_crs,
+            transform_context=context.transformContext(),
+        )
+
+        def report_error(feature: QgsFeature, _error: QgsCsException) -> None:
+            feedback.reportError(
+                translate(
+                    "processing",
+                    "Encountered a transform error when reprojecting feature "
+                    "with id {}.",
+                ).format(feature.id())
+            )
+
+        total = source.featureCount()
+        step = 100.0 / total if total > 0 else 0
+        for current, feature in enumerate(
+            transformer.transform_features(
+                source.getFeatures(), on_error=report_error
+            )
+        ):
+            if feedback.isCanceled():
+                break
+
+            sink.addFeature(feature, QgsFeatureSink.FastInsert)
+            feedback.setProgress(int(current * step))
+
+        return {self.OUTPUT: destination_id}
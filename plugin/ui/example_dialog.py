@@ -1,12 +1,9 @@
-from pathlib import Path
-
 from qgis.core import (
     QgsProject,
     QgsRasterLayer,
 )
 from qgis.PyQt import QtWidgets, uic
 from qgis.PyQt.QtWidgets import QDialog, QWidget
-from qgis.utils import iface
 
 from plugin.utilities.i18n import translate
 from plugin.utilities.logger import get_plugin_logger
@@ -14,6 +11,8 @@ from plugin.utilities.message_builder import (
     MessageBuilder,
     MessageLevel,
 )
+from plugin.utilities.refresh_scheduler import get_refresh_scheduler
+from plugin.utilities.resource_registry import open_resource
 
 LOG = get_plugin_logger()
 
@@ -24,7 +23,7 @@ class ExampleDialog(QDialog):
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
 
-        uic.loadUi(Path(__file__).parent / "example_dialog.ui", self)
+        uic.loadUi(open_resource("ui/example_dialog.ui"), self)
 
         self.add_layer_button: QtWidgets.QPushButton
         self.remove_layer_button: QtWidgets.QPushButton
@@ -63,5 +62,4 @@ class ExampleDialog(QDialog):
         )
         if layer_to_remove:
             QgsProject.instance().removeMapLayer(layer_to_remove[0])
-
-        iface.mapCanvas().refresh()
+            get_refresh_scheduler().request_canvas_refresh()
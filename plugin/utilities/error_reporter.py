@@ -0,0 +1,210 @@
+"""Deferred reporting of plugin errors in the QGIS UI.
+
+Plugin exceptions only carry error data. Errors that are reported
+explicitly with report_error or that are left uncaught are queued and shown
+in the message bar on the main thread in batches, so raising and reporting
+errors is cheap and safe from any thread.
+"""
+
+import sys
+import threading
+from collections import Counter
+from types import TracebackType
+from typing import Any
+
+from qgis.PyQt.QtCore import QObject, QTimer, pyqtSignal
+from qgis.utils import iface
+
+from plugin.exceptions import BasePluginException
+from plugin.utilities.flight_recorder import dump_flight_recorder
+from plugin.utilities.logger import get_plugin_logger
+from plugin.utilities.message_builder import (
+    MessageBuilder,
+    MessageLevel,
+)
+
+LOG = get_plugin_logger()
+
+BATCH_WINDOW_MS = 250
+
+_reporter: "ErrorReporter | None" = None
+
+
+class ErrorReporter(QObject):
+    """Queue of errors shown in the message bar on the main thread.
+
+    Reporter must be created on the main thread. Errors can be reported from
+    any thread, the queued signal connection moves the flush to the main
+    thread.
+    """
+
+    errors_queued = pyqtSignal()
+
+    def __init__(self, batch_window_ms: int = BATCH_WINDOW_MS) -> None:
+        super().__init__()
+
+        self._lock = threading.Lock()
+        self._errors: list[BasePluginException] = []
+        self._flush_requested = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(batch_window_ms)
+        self._timer.timeout.connect(self.flush)
+
+        self.errors_queued.connect(self._start_timer)
+
+    def report(self, error: BasePluginException) -> None:
+        """Queue error to be shown in the next batch.
+
+        Args:
+            error (BasePluginException): error to show
+        """
+        with self._lock:
+            self._errors.append(error)
+            if self._flush_requested:
+                return
+            self._flush_requested = True
+
+        self.errors_queued.emit()
+
+    def _start_timer(self) -> None:
+        self._timer.start()
+
+    def flush(self) -> None:
+        """Show queued errors. Identical messages are shown only once."""
+        with self._lock:
+            errors = self._errors
+            self._errors = []
+            self._flush_requested = False
+
+        if not errors:
+            return
+
+        counts = Counter(get_bar_message(error) for error in errors)
+        for message, count in counts.items():
+            LOG.error("%s (%dx)", message, count)
+
+        if iface is None:
+            return
+
+        message, count = next(iter(counts.items()))
+        if count > 1:
+            message = f"{message} ({count}x)"
+        if len(counts) > 1:
+            message = f"{message} (+{len(counts) - 1})"
+
+        MessageBuilder.create_bar_message(
+            message,
+            get_bar_level(errors[0]),
+            errors[0].bar_msg.get("duration"),
+        )
+
+    def stop(self) -> None:
+        """Stop pending flush and drop queued errors."""
+        self._timer.stop()
+        with self._lock:
+            self._errors = []
+            self._flush_requested = False
+
+
+def get_bar_message(error: BasePluginException) -> str:
+    """Get message shown in the message bar for the error.
+
+    Args:
+        error (BasePluginException): plugin error
+
+    Returns:
+        str: bar message or exception message if it is not defined
+    """
+    return error.bar_msg.get("message") or str(error)
+
+
+def get_bar_level(error: BasePluginException) -> MessageLevel:
+    """Get message bar level for the error.
+
+    Args:
+        error (BasePluginException): plugin error
+
+    Returns:
+        MessageLevel: bar message level. Defaults to MessageLevel.ERROR.
+    """
+    return error.bar_msg.get("level", MessageLevel.ERROR)
+
+
+def report_error(error: BasePluginException) -> None:
+    """Report error to the user.
+
+    Flight recorder is dumped right away and the error is shown in the
+    message bar with the next batch. If error reporting is not installed,
+    e.g. when running without QGIS GUI, the error is logged only.
+
+    Args:
+        error (BasePluginException): error to report
+    """
+    dump_flight_recorder(f"{type(error).__name__}: {error}")
+
+    reporter = _reporter
+    if reporter is None:
+        LOG.error(get_bar_message(error))
+        return
+
+    reporter.report(error)
+
+
+_previous_excepthook = sys.excepthook
+_previous_threading_excepthook = threading.excepthook
+
+
+def _excepthook(
+    exc_type: type[BaseException],
+    exc_value: BaseException,
+    exc_traceback: TracebackType | None,
+) -> None:
+    if isinstance(exc_value, BasePluginException):
+        report_error(exc_value)
+
+    _previous_excepthook(exc_type, exc_value, exc_traceback)
+
+
+def _threading_excepthook(args: Any) -> None:
+    if isinstance(args.exc_value, BasePluginException):
+        report_error(args.exc_value)
+
+    _previous_threading_excepthook(args)
+
+
+def install_error_reporting() -> None:
+    """Create error reporter and report uncaught plugin exceptions.
+
+    Must be called on the main thread.
+    """
+    global _reporter  # noqa: PLW0603
+    global _previous_excepthook, _previous_threading_excepthook  # noqa: PLW0603
+
+    if _reporter is not None:
+        return
+
+    _reporter = ErrorReporter()
+
+    _previous_excepthook = sys.excepthook
+    _previous_threading_excepthook = threading.excepthook
+    sys.excepthook = _excepthook
+    threading.excepthook = _threading_excepthook
+
+
+def uninstall_error_reporting() -> None:
+    """Restore exception hooks and remove error reporter."""
+    global _reporter  # noqa: PLW0603
+
+    if _reporter is None:
+        return
+
+    if sys.excepthook is _excepthook:
+        sys.excepthook = _previous_excepthook
+    if threading.excepthook is _threading_excepthook:
+        threading.excepthook = _previous_threading_excepthook
+
+    _reporter.stop()
+    _reporter.deleteLater()
+    _reporter = None
@@ -0,0 +1,613 @@
+"""Local GeoPackage cache for features fetched from remote services."""
+
+import math
+import sqlite3
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import closing
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransformContext,
+    QgsExpression,
+    QgsFeature,
+    QgsFeatureRequest,
+    QgsFields,
+    QgsRectangle,
+    QgsVectorFileWriter,
+    QgsVectorLayer,
+    QgsWkbTypes,
+)
+
+from plugin.exceptions import GenericException
+from plugin.utilities.logger import get_plugin_logger
+
+LOG = get_plugin_logger()
+
+DELETE_BATCH_SIZE = 500
+DEFAULT_MAX_TILES = 10_000
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+class TimeRange(NamedTuple):
+    start: datetime
+    end: datetime
+
+
+class CacheTile(NamedTuple):
+    column: int
+    row: int
+    time_range: TimeRange | None = None
+
+    def extent(self, tile_size: float) -> QgsRectangle:
+        """Get tile extent in cache CRS units.
+
+        Args:
+            tile_size (float): tile width and height in cache CRS units
+
+        Returns:
+            QgsRectangle: tile extent
+        """
+        return QgsRectangle(
+            self.column * tile_size,
+            self.row * tile_size,
+            (self.column + 1) * tile_size,
+            (self.row + 1) * tile_size,
+        )
+
+
+FeatureFetcher = Callable[
+    [QgsRectangle, TimeRange | None], Iterable[QgsFeature]
+]
+
+
+def _to_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def get_time_buckets(
+    time_range: TimeRange | None,
+    bucket_size: timedelta,
+) -> list[TimeRange | None]:
+    """Split time range into buckets aligned to the unix epoch.
+
+    Aligned buckets make different but overlapping time ranges share the
+    already fetched tiles.
+
+    Args:
+        time_range (TimeRange | None): requested time range. None means that
+            features are not time dependent.
+        bucket_size (timedelta): length of a single time bucket
+
+    Returns:
+        list[TimeRange | None]: buckets covering the whole time range
+    """
+    if time_range is None:
+        return [None]
+
+    start = _to_utc(time_range.start)
+    end = _to_utc(time_range.end)
+
+    first = math.floor((start - EPOCH) / bucket_size)
+    last = max(math.ceil((end - EPOCH) / bucket_size), first + 1)
+
+    return [
+        TimeRange(EPOCH + i * bucket_size, EPOCH + (i + 1) * bucket_size)
+        for i in range(first, last)
+    ]
+
+
+def _tile_bounds(
+    extent: QgsRectangle, tile_size: float
+) -> tuple[int, int, int, int]:
+    first_column = math.floor(extent.xMinimum() / tile_size)
+    last_column = math.ceil(extent.xMaximum() / tile_size)
+    first_row = math.floor(extent.yMinimum() / tile_size)
+    last_row = math.ceil(extent.yMaximum() / tile_size)
+
+    return (
+        first_column,
+        max(last_column, first_column + 1),
+        first_row,
+        max(last_row, first_row + 1),
+    )
+
+
+def get_tile_count(extent: QgsRectangle, tile_size: float) -> int:
+    """Get number of grid aligned tiles covering the extent.
+
+    Args:
+        extent (QgsRectangle): extent in cache CRS
+        tile_size (float): tile width and height in cache CRS units
+
+    Returns:
+        int: number of tiles in a single time bucket
+    """
+    first_column, end_column, first_row, end_row = _tile_bounds(
+        extent, tile_size
+    )
+    return (end_column - first_column) * (end_row - first_row)
+
+
+def get_tiles_for_extent(
+    extent: QgsRectangle,
+    tile_size: float,
+    time_range: TimeRange | None = None,
+    bucket_size: timedelta = timedelta(days=1),
+) -> list[CacheTile]:
+    """Get grid aligned tiles covering the extent and time range.
+
+    Args:
+        extent (QgsRectangle): extent in cache CRS
+        tile_size (float): tile width and height in cache CRS units
+        time_range (TimeRange | None, optional): requested time range.
+            Defaults to None.
+        bucket_size (timedelta, optional): length of a single time bucket.
+            Defaults to one day.
+
+    Returns:
+        list[CacheTile]: tiles covering the extent
+    """
+    first_column, end_column, first_row, end_row = _tile_bounds(
+        extent, tile_size
+    )
+
+    return [
+        CacheTile(column, row, bucket)
+        for bucket in get_time_buckets(time_range, bucket_size)
+        for row in range(first_row, end_row)
+        for column in range(first_column, end_column)
+    ]
+
+
+def merge_tile_runs(tiles: Iterable[CacheTile]) -> list[list[CacheTile]]:
+    """Group horizontally adjacent tiles of the same row and time bucket.
+
+    Each group can be fetched from the server with a single bbox request.
+
+    Args:
+        tiles (Iterable[CacheTile]): tiles to group
+
+    Returns:
+        list[list[CacheTile]]: groups of adjacent tiles
+    """
+    runs: list[list[CacheTile]] = []
+
+    for tile in sorted(
+        tiles,
+        key=lambda t: (
+            t.time_range.start if t.time_range else EPOCH,
+            t.row,
+            t.column,
+        ),
+    ):
+        previous = runs[-1][-1] if runs else None
+        if (
+            previous is not None
+            and previous.row == tile.row
+            and previous.time_range == tile.time_range
+            and previous.column + 1 == tile.column
+        ):
+            runs[-1].append(tile)
+        else:
+            runs.append([tile])
+
+    return runs
+
+
+class FeatureCache:
+    """Feature cache stored in a GeoPackage layer.
+
+    Features are written into a GeoPackage layer which has an R-tree spatial
+    index, so reading features of an area is an index lookup. Fetched areas
+    are tracked as grid aligned bbox and time range tiles in a separate
+    table of the same GeoPackage. Only missing and stale tiles are requested
+    from the server. Extents covering more than max_tiles tiles are fetched
+    with a single request without tile bookkeeping.
+
+    Cache uses a QGIS layer and its data provider, which are not thread
+    safe, so an instance must be used only from the thread that created it.
+    Create a separate instance for each thread instead.
+    """
+
+    def __init__(
+        self,
+        gpkg_path: Path,
+        layer_name: str,
+        fields: QgsFields,
+        geometry_type: QgsWkbTypes.Type,
+        crs: QgsCoordinateReferenceSystem,
+        fetcher: FeatureFetcher,
+        *,
+        id_field: str,
+        time_field: str | None = None,
+        tile_size: float = 1000.0,
+        bucket_size: timedelta = timedelta(days=1),
+        max_age: timedelta | None = None,
+        max_tiles: int = DEFAULT_MAX_TILES,
+    ) -> None:
+        """Initialize the cache and create the GeoPackage layer if needed.
+
+        Args:
+            gpkg_path (Path): path to the GeoPackage file
+            layer_name (str): layer name inside the GeoPackage
+            fields (QgsFields): fields of the cached features
+            geometry_type (QgsWkbTypes.Type): geometry type of the features
+            crs (QgsCoordinateReferenceSystem): CRS of the features and tiles
+            fetcher (FeatureFetcher): callable fetching features of a bbox
+                and time range from the server
+            id_field (str): field with remote feature id. Used for replacing
+                already cached features with refetched ones.
+            time_field (str | None, optional): field with feature timestamp.
+                Required for time range queries. Defaults to None.
+            tile_size (float, optional): tile width and height in CRS units.
+                Defaults to 1000.0.
+            bucket_size (timedelta, optional): length of a time tile.
+                Defaults to one day.
+            max_age (timedelta | None, optional): age after which a fetched
+                tile is considered stale. None keeps tiles forever.
+                Defaults to None.
+            max_tiles (int, optional): maximum number of tiles synced
+                separately. Larger extents are fetched with a single
+                request. Defaults to DEFAULT_MAX_TILES.
+        """
+        self.gpkg_path = gpkg_path
+        self.layer_name = layer_name
+        self.fetcher = fetcher
+        self.id_field = id_field
+        self.time_field = time_field
+        self.tile_size = tile_size
+        self.bucket_size = bucket_size
+        self.max_age = max_age
+        self.max_tiles = max_tiles
+
+        self._thread_id = threading.get_ident()
+
+        if not self._layer_exists():
+            self._create_layer(fields, geometry_type, crs)
+        self._create_tiles_table()
+
+        self._layer = QgsVectorLayer(
+            f"{self.gpkg_path}|layername={self.layer_name}",
+            self.layer_name,
+            "ogr",
+        )
+        if not self._layer.isValid():
+            msg = f"Invalid cache layer {self.layer_name} in {gpkg_path}"
+            raise GenericException(msg)
+
+    @property
+    def layer(self) -> QgsVectorLayer:
+        """Get the cache layer e.g. for adding it to the project."""
+        return self._layer
+
+    def get_features(
+        self,
+        extent: QgsRectangle,
+        time_range: TimeRange | None = None,
+    ) -> Iterator[QgsFeature]:
+        """Get features of the extent and fetch missing areas first.
+
+        Args:
+            extent (QgsRectangle): extent in cache CRS
+            time_range (TimeRange | None, optional): time range of the
+                features. Defaults to None.
+
+        Returns:
+            Iterator[QgsFeature]: cached features of the extent
+        """
+        self.sync(extent, time_range)
+        return self.read_features(extent, time_range)
+
+    def read_features(
+        self,
+        extent: QgsRectangle,
+        time_range: TimeRange | None = None,
+    ) -> Iterator[QgsFeature]:
+        """Read features of the extent from the cache only.
+
+        Args:
+            extent (QgsRectangle): extent in cache CRS
+            time_range (TimeRange | None, optional): time range of the
+                features. Defaults to None.
+
+        Returns:
+            Iterator[QgsFeature]: cached features of the extent
+        """
+        self._check_thread()
+
+        request = QgsFeatureRequest().setFilterRect(extent)
+
+        if time_range is not None and self.time_field is not None:
+            field = QgsExpression.quotedColumnRef(self.time_field)
+            start = QgsExpression.quotedValue(
+                _to_utc(time_range.start).isoformat()
+            )
+            end = QgsExpression.quotedValue(
+                _to_utc(time_range.end).isoformat()
+            )
+            request.setFilterExpression(
+                f"{field} >= to_datetime({start}) "
+                f"AND {field} < to_datetime({end})"
+            )
+
+        return self._layer.getFeatures(request)
+
+    def get_missing_tiles(
+        self,
+        extent: QgsRectangle,
+        time_range: TimeRange | None = None,
+    ) -> list[CacheTile]:
+        """Get tiles of the extent that are not fetched or are stale.
+
+        Args:
+            extent (QgsRectangle): extent in cache CRS
+            time_range (TimeRange | None, optional): time range of the
+                features. Defaults to None.
+
+        Returns:
+            list[CacheTile]: tiles that should be fetched from the server
+        """
+        tiles = get_tiles_for_extent(
+            extent, self.tile_size, time_range, self.bucket_size
+        )
+        fetched = self._read_fetched_tiles(tiles)
+
+        stale_before = (
+            datetime.now(UTC) - self.max_age
+            if self.max_age is not None
+            else None
+        )
+        return [
+            tile
+            for tile in tiles
+            if tile not in fetched
+            or (stale_before is not None and fetched[tile] < stale_before)
+        ]
+
+    def sync(
+        self,
+        extent: QgsRectangle,
+        time_range: TimeRange | None = None,
+    ) -> int:
+        """Fetch missing and stale tiles of the extent into the cache.
+
+        Args:
+            extent (QgsRectangle): extent in cache CRS
+            time_range (TimeRange | None, optional): time range of the
+                features. Defaults to None.
+
+        Returns:
+            int: number of fetched features
+        """
+        self._check_thread()
+
+        tile_count = get_tile_count(extent, self.tile_size) * len(
+            get_time_buckets(time_range, self.bucket_size)
+        )
+        if tile_count > self.max_tiles:
+            LOG.debug(
+                "Extent %s covers %d cache tiles, fetching it directly",
+                extent,
+                tile_count,
+            )
+            features = list(self.fetcher(extent, time_range))
+            self._write_features(features)
+            return len(features)
+
+        fetched_count = 0
+        for run in merge_tile_runs(self.get_missing_tiles(extent, time_range)):
+            run_extent = run[0].extent(self.tile_size)
+            run_extent.combineExtentWith(run[-1].extent(self.tile_size))
+
+            LOG.debug("Fetching %d cache tiles of %s", len(run), run_extent)
+            features = list(self.fetcher(run_extent, run[0].time_range))
+
+            self._write_features(features)
+            self._mark_fetched(run)
+            fetched_count += len(features)
+
+        return fetched_count
+
+    def invalidate(self, extent: QgsRectangle | None = None) -> None:
+        """Mark tiles as not fetched so they are requested again.
+
+        Args:
+            extent (QgsRectangle | None, optional): extent of the tiles to
+                invalidate. None invalidates all tiles. Defaults to None.
+        """
+        with closing(self._connect()) as connection, connection:
+            if extent is None:
+                connection.execute(
+                    "DELETE FROM plugin_cache_tiles WHERE layer_name = ?",
+                    (self.layer_name,),
+                )
+                return
+
+            first_column, end_column, first_row, end_row = _tile_bounds(
+                extent, self.tile_size
+            )
+            connection.execute(
+                "DELETE FROM plugin_cache_tiles "
+                "WHERE layer_name = ? AND tile_size = ? "
+                "AND tile_column BETWEEN ? AND ? AND tile_row BETWEEN ? AND ?",
+                (
+                    self.layer_name,
+                    self.tile_size,
+                    first_column,
+                    end_column - 1,
+                    first_row,
+                    end_row - 1,
+                ),
+            )
+
+    def _check_thread(self) -> None:
+        if threading.get_ident() != self._thread_id:
+            msg = (
+                f"Cache {self.layer_name} must be used from the thread "
+                "that created it"
+            )
+            raise GenericException(msg)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.gpkg_path, timeout=30)
+
+    def _layer_exists(self) -> bool:
+        if not self.gpkg_path.exists():
+            return False
+
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT 1 FROM gpkg_contents WHERE table_name = ?",
+                (self.layer_name,),
+            ).fetchone()
+
+        return row is not None
+
+    def _create_layer(
+        self,
+        fields: QgsFields,
+        geometry_type: QgsWkbTypes.Type,
+        crs: QgsCoordinateReferenceSystem,
+    ) -> None:
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = "GPKG"
+        options.layerName = self.layer_name
+        options.layerOptions = ["SPATIAL_INDEX=YES"]
+        options.actionOnExistingFile = (
+            QgsVectorFileWriter.CreateOrOverwriteLayer
+            if self.gpkg_path.exists()
+            else QgsVectorFileWriter.CreateOrOverwriteFile
+        )
+
+        writer = QgsVectorFileWriter.create(
+            str(self.gpkg_path),
+            fields,
+            geometry_type,
+            crs,
+            QgsCoordinateTransformContext(),
+            options,
+        )
+        if writer.hasError() != QgsVectorFileWriter.NoError:
+            raise GenericException(writer.errorMessage())
+
+        # writer flushes and closes the file when it is deleted
+        del writer
+
+    def _create_tiles_table(self) -> None:
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS plugin_cache_tiles ("
+                "layer_name TEXT NOT NULL, "
+                "tile_column INTEGER NOT NULL, "
+                "tile_row INTEGER NOT NULL, "
+                "time_start TEXT NOT NULL, "
+                "time_end TEXT NOT NULL, "
+                "tile_size REAL NOT NULL, "
+                "fetched_at TEXT NOT NULL, "
+                "PRIMARY KEY (layer_name, tile_column, tile_row, "
+                "time_start, time_end, tile_size))"
+            )
+
+    def _tile_key(self, tile: CacheTile) -> tuple:
+        time_start = time_end = ""
+        if tile.time_range is not None:
+            time_start = tile.time_range.start.isoformat()
+            time_end = tile.time_range.end.isoformat()
+
+        return (
+            self.layer_name,
+            tile.column,
+            tile.row,
+            time_start,
+            time_end,
+            self.tile_size,
+        )
+
+    def _read_fetched_tiles(
+        self, tiles: list[CacheTile]
+    ) -> dict[CacheTile, datetime]:
+        if not tiles:
+            return {}
+
+        columns = [t.column for t in tiles]
+        rows = [t.row for t in tiles]
+        tiles_by_key = {self._tile_key(t): t for t in tiles}
+
+        with closing(self._connect()) as connection:
+            result = connection.execute(
+                "SELECT layer_name, tile_column, tile_row, time_start, "
+                "time_end, tile_size, fetched_at FROM plugin_cache_tiles "
+                "WHERE layer_name = ? AND tile_size = ? "
+                "AND tile_column BETWEEN ? AND ? AND tile_row BETWEEN ? AND ?",
+                (
+                    self.layer_name,
+                    self.tile_size,
+                    min(columns),
+                    max(columns),
+                    min(rows),
+                    max(rows),
+                ),
+            ).fetchall()
+
+        return {
+            tiles_by_key[tuple(row[:6])]: datetime.fromisoformat(row[6])
+            for row in result
+            if tuple(row[:6]) in tiles_by_key
+        }
+
+    def _mark_fetched(self, tiles: list[CacheTile]) -> None:
+        fetched_at = datetime.now(UTC).isoformat()
+
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO plugin_cache_tiles VALUES "
+                "(?, ?, ?, ?, ?, ?, ?)",
+                [(*self._tile_key(t), fetched_at) for t in tiles],
+            )
+
+    def _write_features(self, features: list[QgsFeature]) -> None:
+        if not features:
+            return
+
+        provider = self._layer.dataProvider()
+        id_field = QgsExpression.quotedColumnRef(self.id_field)
+        remote_ids = list({f[self.id_field] for f in features})
+
+        # Replace already cached versions of the fetched features
+        stale_fids: list[int] = []
+        for i in range(0, len(remote_ids), DELETE_BATCH_SIZE):
+            values = ", ".join(
+                QgsExpression.quotedValue(v)
+                for v in remote_ids[i : i + DELETE_BATCH_SIZE]
+            )
+            request = (
+                QgsFeatureRequest()
+                .setFilterExpression(f"{id_field} IN ({values})")
+                .setFlags(QgsFeatureRequest.NoGeometry)
+                .setNoAttributes()
+            )
+            stale_fids.extend(f.id() for f in provider.getFeatures(request))
+
+        if stale_fids:
+            provider.deleteFeatures(stale_fids)
+
+        fields = provider.fields()
+        cache_features = []
+        for feature in features:
+            cache_feature = QgsFeature(fields)
+            cache_feature.setGeometry(feature.geometry())
+            for field in feature.fields():
+                if fields.indexOf(field.name()) != -1:
+                    cache_feature[field.name()] = feature[field.name()]
+            cache_features.append(cache_feature)
+
+        success, _ = provider.addFeatures(cache_features)
+        if not success:
+            msg = f"Writing features to cache {self.layer_name} failed"
+            raise GenericException(msg)
@@ -0,0 +1,189 @@
+"""In-memory flight recorder for debug log records.
+
+Flight recorder keeps the latest log records of all levels in a ring buffer
+without formatting them. Records are formatted and written into a file only
+when an error is logged or a plugin exception is reported, so full debug
+context is available without the cost of writing debug logs all the time.
+"""
+
+import copy
+import logging
+from collections import deque
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+
+from qgis.core import QgsApplication
+
+from plugin.utilities.resources import get_plugin_name
+
+MAX_DUMP_FILE_SIZE = 10 * 1024 * 1024
+
+# Arguments of these types are kept as is, other arguments are formatted into
+# the message when the record is stored so that the buffer does not keep
+# references to large or mutable objects
+PRIMITIVE_ARG_TYPES = (str, bytes, int, float, bool, type(None))
+
+_active_recorder: "FlightRecorderHandler | None" = None
+
+
+class FlightRecorderHandler(logging.Handler):
+    """Log handler storing records into a ring buffer"""
+
+    def __init__(
+        self,
+        capacity: int,
+        dump_path: Path,
+        dump_level: int = logging.ERROR,
+    ) -> None:
+        """Initialize the handler.
+
+        Args:
+            capacity (int): maximum number of records kept in memory
+            dump_path (Path): file the records are dumped into
+            dump_level (int, optional): records of this level and above
+                dump the buffer. Defaults to logging.ERROR.
+        """
+        logging.Handler.__init__(self, level=logging.DEBUG)
+
+        self.records: deque[logging.LogRecord] = deque(maxlen=capacity)
+        self.dump_path = dump_path
+        self.dump_level = dump_level
+
+        self._record_count = 0
+        self._dumped_count = 0
+
+        self.setFormatter(
+            logging.Formatter(
+                "%(asctime)s - [%(levelname)s] - %(threadName)s - %(filename)s:%(funcName)s():%(lineno)d - %(message)s",  # noqa: E501
+                "%d.%m.%Y %H:%M:%S",
+            )
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.records.append(self._prepare(record))
+            self._record_count += 1
+
+            if record.levelno >= self.dump_level:
+                self.dump(f"{record.levelname} logged")
+        except RecursionError:
+            raise
+        except Exception:  # noqa: BLE001
+            self.handleError(record)
+
+    def dump(self, reason: str) -> bool:
+        """Write records that have not been dumped yet into the dump file.
+
+        Args:
+            reason (str): reason for the dump written into the file
+
+        Returns:
+            bool: True if records were written
+        """
+        with self.lock:  # type: ignore[union-attr]
+            new_count = min(
+                self._record_count - self._dumped_count, len(self.records)
+            )
+            if new_count == 0:
+                return False
+
+            records = list(self.records)[-new_count:]
+            self._dumped_count = self._record_count
+
+        try:
+            self._rotate()
+            with self.dump_path.open("a", encoding="utf-8") as dump_file:
+                dump_file.write(
+                    f"=== {datetime.now().isoformat()} {reason} ===\n"  # noqa: DTZ005
+                )
+                dump_file.writelines(
+                    f"{self._format_safely(record)}\n" for record in records
+                )
+        except OSError:
+            return False
+
+        return True
+
+    def close(self) -> None:
+        global _active_recorder  # noqa: PLW0603
+
+        if _active_recorder is self:
+            _active_recorder = None
+
+        self.records.clear()
+        super().close()
+
+    def _prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args or ()
+        args_values = args.values() if isinstance(args, Mapping) else args
+        primitive_args = all(
+            isinstance(arg, PRIMITIVE_ARG_TYPES) for arg in args_values
+        )
+        if primitive_args and record.exc_info is None:
+            return record
+
+        # copy so that other handlers still get the original record
+        record = copy.copy(record)
+        if not primitive_args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info is not None:
+            # traceback would keep the frames and their locals alive
+            if record.exc_text is None:
+                formatter = self.formatter or logging.Formatter()
+                record.exc_text = formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def _format_safely(self, record: logging.LogRecord) -> str:
+        try:
+            return self.format(record)
+        except Exception:  # noqa: BLE001
+            return (
+                f"Failed to format record {record.filename}:{record.lineno}"
+                f" - msg={record.msg!r} args={record.args!r}"
+            )
+
+    def _rotate(self) -> None:
+        if (
+            self.dump_path.exists()
+            and self.dump_path.stat().st_size > MAX_DUMP_FILE_SIZE
+        ):
+            self.dump_path.replace(self.dump_path.with_suffix(".log.old"))
+
+
+def get_flight_recorder_handler(capacity: int) -> FlightRecorderHandler:
+    """Get flight recorder handler and make it the active recorder.
+
+    Args:
+        capacity (int): maximum number of records kept in memory
+
+    Returns:
+        FlightRecorderHandler: FlightRecorderHandler class
+    """
+    global _active_recorder  # noqa: PLW0603
+
+    dump_path = (
+        Path(QgsApplication.qgisSettingsDirPath())
+        / f"{get_plugin_name()}-flight-recorder.log"
+    )
+    _active_recorder = FlightRecorderHandler(capacity, dump_path)
+
+    return _active_recorder
+
+
+def dump_flight_recorder(reason: str) -> bool:
+    """Dump records of the active flight recorder.
+
+    Args:
+        reason (str): reason for the dump written into the file
+
+    Returns:
+        bool: True if records were written
+    """
+    recorder = _active_recorder
+    if recorder is None:
+        return False
+
+    return recorder.dump(reason)
@@ -1,15 +1,12 @@
-import os
-
-from qgis.PyQt.QtCore import QCoreApplication, QSettings
+from qgis.PyQt.QtCore import QCoreApplication, QFile
 
 DEFAULT_LOCALE = "fi"
 
 
-def setup_translations(plugin_dir_path: str) -> str:
+def setup_translations() -> str:
     """Return QGIS locale and compiled translation file path for locale
 
-    Args:
-        plugin_dir_path (str): directory path to plugin source files
+    Translation file is read from the resource bundle if it is registered.
 
     Raises:
         FileNotFoundError: raised if locale file cannot be found
@@ -17,15 +14,17 @@ def setup_translations(plugin_dir_path: str) -> str:
     Returns:
         str: translation .qm-file path
     """
-    locale = QSettings().value("locale/userLocale")[0:2]
+    # imported here to avoid circular import through plugin.exceptions
+    from plugin.utilities.resource_registry import get_resource_file
+    from plugin.utilities.settings import get_settings
+
+    locale = get_settings().locale
     if locale not in ["fi"]:
         locale = DEFAULT_LOCALE
 
-    locale_path = os.path.join(
-        plugin_dir_path, "resources", "i18n", f"{format(locale)}.qm"
-    )
+    locale_path = get_resource_file(f"resources/i18n/{locale}.qm")
 
-    if not os.path.exists(locale_path):
+    if not QFile.exists(locale_path):
         raise FileNotFoundError(locale_path)
 
     return locale_path
@@ -1,5 +1,4 @@
 import logging
-import os
 from enum import Enum
 from pathlib import Path
 
@@ -9,10 +8,20 @@ from qgis.core import (
     QgsMessageLog,
 )
 
-from plugin.utilities.resources import (
-    get_env_variable,
-    get_plugin_name,
+from plugin.utilities.flight_recorder import (
+    FlightRecorderHandler,
+    get_flight_recorder_handler,
 )
+from plugin.utilities.resources import get_plugin_name
+from plugin.utilities.settings import (
+    PluginSettings,
+    SettingsSubscriber,
+    get_settings,
+    subscribe,
+    unsubscribe,
+)
+
+_settings_subscribers: dict[str, SettingsSubscriber] = {}
 
 
 class LogLevel(Enum):
@@ -93,14 +102,14 @@ def get_implicit_log_level() -> int:
     Returns:
         int: logging level
     """
-    if get_env_variable("PLUGIN_DEBUGGING_ENABLED") == "1":
+    if get_settings().debugging_enabled:
         return logging.DEBUG
 
     return logging.INFO
 
 
 def get_logging_level() -> int:
-    """Set logging level from environment variable.
+    """Get logging level from environment variable PLUGIN_LOG_LEVEL.
     Otherwise default to implicit log level
 
     https://docs.python.org/3/library/logging.html#levels
@@ -108,14 +117,24 @@ def get_logging_level() -> int:
     Returns:
         int: logging level
     """
-    log_level = os.environ.get("PLUGIN_LOG_LEVEL")
-    if log_level is None:
-        return get_implicit_log_level()
+    return get_settings().log_level
+
+
+def get_logger_level(settings: PluginSettings) -> int:
+    """Get level of the logger itself. DEBUG records are let through to
+    the flight recorder when it is enabled, output handlers filter them
+    with their own level.
 
-    try:
-        return int(log_level)
-    except (TypeError, ValueError):
-        return get_implicit_log_level()
+    Args:
+        settings (PluginSettings): plugin settings
+
+    Returns:
+        int: logging level
+    """
+    if settings.flight_recorder_size > 0:
+        return min(settings.log_level, logging.DEBUG)
+
+    return settings.log_level
 
 
 def get_plugin_logger() -> logging.Logger:
@@ -135,14 +154,29 @@ def init_logger(logger_name: str) -> None:
     """
     logger = logging.getLogger(logger_name)
 
-    log_level = get_logging_level()
-    logger.setLevel(log_level)
+    settings = get_settings()
+    log_level = settings.log_level
+    logger.setLevel(get_logger_level(settings))
 
     logger.addHandler(get_qgis_log_handler(log_level))
 
-    if get_env_variable("DEBUGGING_ENABLED") == "1":
+    if settings.file_logging_enabled:
         logger.addHandler(get_file_log_handler(log_level))
 
+    if settings.flight_recorder_size > 0:
+        logger.addHandler(
+            get_flight_recorder_handler(settings.flight_recorder_size)
+        )
+
+    def update_log_level(new_settings: PluginSettings) -> None:
+        logger.setLevel(get_logger_level(new_settings))
+        for handler in logger.handlers:
+            if not isinstance(handler, FlightRecorderHandler):
+                handler.setLevel(new_settings.log_level)
+
+    _settings_subscribers[logger_name] = update_log_level
+    subscribe(update_log_level)
+
 
 def remove_logger(logger_name: str) -> None:
     """Remove custom logger with provided name
@@ -152,8 +186,12 @@ def remove_logger(logger_name: str) -> None:
     """
     logger = logging.getLogger(logger_name)
 
+    settings_subscriber = _settings_subscribers.pop(logger_name, None)
+    if settings_subscriber is not None:
+        unsubscribe(settings_subscriber)
+
     for handler in logger.handlers[:]:
-        if isinstance(handler, logging.FileHandler):
+        if isinstance(handler, logging.FileHandler | FlightRecorderHandler):
             handler.close()
 
         logger.removeHandler(handler)
@@ -1,17 +1,21 @@
 import json
+import threading
+from functools import lru_cache
 from typing import Literal, NamedTuple
 
-from qgis.core import (
-    Qgis,
-    QgsBlockingNetworkRequest,
-    QgsNetworkReplyContent,
-)
-from qgis.PyQt.QtCore import QSettings, QUrl
+from qgis.core import QgsNetworkReplyContent
+from qgis.PyQt.QtCore import QUrl
 from qgis.PyQt.QtNetwork import QNetworkReply, QNetworkRequest
 
 from plugin.exceptions import NetworkException
-from plugin.utilities.message_builder import MessageBuilder
-from plugin.utilities.resources import get_plugin_name
+from plugin.utilities.message_builder import MessageLevel
+from plugin.utilities.network_session import get_network_session
+from plugin.utilities.rate_limiter import (
+    WILDCARD_HOST,
+    HostRateLimiter,
+    RequestPriority,
+)
+from plugin.utilities.settings import PluginSettings, get_settings, subscribe
 
 
 class FileInfo(NamedTuple):
@@ -25,23 +29,203 @@ class FileField(NamedTuple):
     file_info: FileInfo
 
 
+RequestKey = tuple[str, str, tuple[tuple[str, str], ...]]
+
+# Rate limit wait does not process Qt events, so the GUI thread may wait
+# only briefly
+MAIN_THREAD_RATE_LIMIT_TIMEOUT = 1.0
+RATE_LIMIT_TIMEOUT = 60.0
+
+
+class InFlightRequest:
+    """Request in progress that identical requests can wait for."""
+
+    def __init__(
+        self, priority: RequestPriority = RequestPriority.INTERACTIVE
+    ) -> None:
+        self.thread_id = threading.get_ident()
+        self.priority = priority
+        self._done = threading.Event()
+        self._content: bytes = b""
+        self._error: Exception | None = None
+
+    def set_result(self, content: bytes) -> None:
+        self._content = content
+        self._done.set()
+
+    def set_error(self, error: Exception) -> None:
+        self._error = error
+        self._done.set()
+
+    def can_wait(self, priority: RequestPriority) -> bool:
+        """Check whether the current thread may wait for the request.
+
+        Waiting blocks the thread without processing Qt events, so the main
+        thread and the thread sending the request never wait. Requests do
+        not wait for a request of lower priority either.
+
+        Args:
+            priority (RequestPriority): priority of the waiting request
+
+        Returns:
+            bool: True if the request can be waited for
+        """
+        return (
+            self.thread_id != threading.get_ident()
+            and threading.current_thread() is not threading.main_thread()
+            and self.priority <= priority
+        )
+
+    def wait(self) -> bytes:
+        """Wait for the request to finish.
+
+        Raises:
+            NetworkException: new exception for this caller chained to the
+                error raised by the request
+
+        Returns:
+            bytes: request content in bytes
+        """
+        self._done.wait()
+
+        error = self._error
+        if error is None:
+            return self._content
+
+        if isinstance(error, NetworkException):
+            raise NetworkException(
+                str(error), error=error.error, bar_msg=dict(error.bar_msg)
+            ) from error
+        raise NetworkException(str(error) or None) from error
+
+
+_in_flight_requests: dict[RequestKey, InFlightRequest] = {}
+_in_flight_lock = threading.Lock()
+
+
+def get_request_key(
+    method: str, url: str, headers: dict[str, str] | None = None
+) -> RequestKey:
+    """Get key identifying identical requests
+
+    Args:
+        method (str): request method
+        url (str): resource address
+        headers (dict[str, str] | None, optional): request headers.
+            Defaults to None.
+
+    Returns:
+        RequestKey: request key
+    """
+    return method, url, tuple(sorted((headers or {}).items()))
+
+
+def _configure_rate_limiter(settings: PluginSettings) -> None:
+    host_limits = dict(settings.rate_limits)
+    get_rate_limiter().configure(
+        host_limits.pop(WILDCARD_HOST, None), host_limits
+    )
+
+
+@lru_cache
+def get_rate_limiter() -> HostRateLimiter:
+    """Get rate limiter shared by all plugin requests.
+
+    Limits are configured with environment variable PLUGIN_RATE_LIMITS,
+    see parse_rate_limits for the format. Use quota_state of the limiter to
+    follow the quota of a host.
+
+    Returns:
+        HostRateLimiter: rate limiter
+    """
+    host_limits = dict(get_settings().rate_limits)
+    rate_limiter = HostRateLimiter(
+        host_limits.pop(WILDCARD_HOST, None), host_limits
+    )
+    subscribe(_configure_rate_limiter)
+
+    return rate_limiter
+
+
+def get_rate_limit_timeout() -> float:
+    """Get maximum time to wait for the rate limit on the current thread.
+
+    Returns:
+        float: timeout in seconds
+    """
+    if threading.current_thread() is threading.main_thread():
+        return MAIN_THREAD_RATE_LIMIT_TIMEOUT
+    return RATE_LIMIT_TIMEOUT
+
+
 def get(
     url: str,
+    headers: dict[str, str] | None = None,
+    priority: RequestPriority = RequestPriority.INTERACTIVE,
 ) -> bytes:
     """Get request
 
+    Identical requests that are made while the request is in progress wait
+    for it and get the same content or error instead of sending a new
+    request. Requests made on the main thread and requests of higher
+    priority than the request in progress are sent separately.
+
     Args:
         url (str): resource address
+        headers (dict[str, str] | None, optional): additional request
+            headers. Defaults to None.
+        priority (RequestPriority, optional): rate limiting priority.
+            Defaults to RequestPriority.INTERACTIVE.
 
     Returns:
         bytes: request content in bytes
     """
-    return request_raw(url, "get")
+    key = get_request_key("get", url, headers)
+
+    with _in_flight_lock:
+        in_flight = _in_flight_requests.get(key)
+        is_leader = in_flight is None or priority < in_flight.priority
+        if in_flight is None or is_leader:
+            # request of higher priority takes over, so that later
+            # requests wait for it instead of the lower priority one
+            in_flight = InFlightRequest(priority)
+            _in_flight_requests[key] = in_flight
+
+    if not is_leader:
+        if in_flight.can_wait(priority):
+            return in_flight.wait()
+        return request_raw(url, "get", headers=headers, priority=priority)
+
+    try:
+        content = request_raw(url, "get", headers=headers, priority=priority)
+    except Exception as e:
+        _finish_in_flight_request(key, in_flight)
+        in_flight.set_error(e)
+        raise
+    except BaseException:
+        # do not pass KeyboardInterrupt or SystemExit to other threads
+        _finish_in_flight_request(key, in_flight)
+        in_flight.set_error(NetworkException("Request was interrupted"))
+        raise
+
+    _finish_in_flight_request(key, in_flight)
+    in_flight.set_result(content)
+
+    return content
+
+
+def _finish_in_flight_request(
+    key: RequestKey, in_flight: InFlightRequest
+) -> None:
+    with _in_flight_lock:
+        if _in_flight_requests.get(key) is in_flight:
+            del _in_flight_requests[key]
 
 
 def post(
     url: str,
     data: dict[str, str] | None = None,
+    priority: RequestPriority = RequestPriority.INTERACTIVE,
 ) -> bytes:
     """Post request
 
@@ -49,34 +233,42 @@ def post(
         url (str): resource address
         data (dict[str, str] | None): request body.
             Defaults to None.
+        priority (RequestPriority, optional): rate limiting priority.
+            Defaults to RequestPriority.INTERACTIVE.
 
     Returns:
         bytes: request content in bytes
     """
-    return request_raw(url, "post", data)
+    return request_raw(url, "post", data, priority=priority)
 
 
-def set_request_headers(req: QNetworkRequest):
-    # http://osgeo-org.1560.x6.nabble.com/QGIS-Developer-Do-we-have-a-User-Agent-string-for-QGIS-td5360740.html
-    user_agent = QSettings().value(
-        "/qgis/networkAndProxy/userAgent", "Mozilla/5.0"
-    )
-    user_agent += " " if len(user_agent) else ""
-    user_agent += f"QGIS/{Qgis.QGIS_VERSION_INT}"
-    user_agent += f" {get_plugin_name}"
+def get_reply_headers(reply: QgsNetworkReplyContent) -> dict[str, str]:
+    """Get reply headers with lower case names
 
-    req.setRawHeader(b"User-Agent", bytes(user_agent, "utf-8"))
+    Args:
+        reply (QgsNetworkReplyContent): network reply
 
-    return req
+    Returns:
+        dict[str, str]: headers by lower case name
+    """
+    return {
+        bytes(name).decode("latin-1").lower(): bytes(
+            reply.rawHeader(name)
+        ).decode("latin-1")
+        for name in reply.rawHeaderList()
+    }
 
 
 def request_raw(
     url: str,
     method: Literal["get", "post"] = "get",
     data: dict[str, str] | None = None,
+    headers: dict[str, str] | None = None,
+    priority: RequestPriority = RequestPriority.INTERACTIVE,
 ) -> bytes:
-    """Network request wrapper using QgsBlockingNetworkRequest. It is
-    recommended way to make external requests from QGIS
+    """Network request wrapper using QgsBlockingNetworkRequest through the
+    shared network session. It is recommended way to make external requests
+    from QGIS
 
     Args:
         url (str): resource address
@@ -84,41 +276,57 @@ def request_raw(
             Defaults to "get".
         data (dict[str, str] | None, optional): post request body.
             Defaults to None.
+        headers (dict[str, str] | None, optional): additional request
+            headers. Defaults to None.
+        priority (RequestPriority, optional): rate limiting priority.
+            Requests wait for the rate limit of the host in priority order.
+            Defaults to RequestPriority.INTERACTIVE.
 
     Raises:
-        Exception: _description_
-        QgsNetworkException: _description_
+        NetworkException: raised if the request fails or the rate limit of
+            the host is not available in time, see get_rate_limit_timeout
 
     Returns:
         bytes: request content in bytes
     """
-    req = QNetworkRequest(QUrl(url))
-    set_request_headers(req)
+    session = get_network_session()
+    req = session.prepare_request(QNetworkRequest(QUrl(url)))
+    for name, value in (headers or {}).items():
+        req.setRawHeader(bytes(name, "utf-8"), bytes(value, "utf-8"))
 
     # QgsApplication.instance().authManager().updateNetworkRequest(
     #     req, AUTH_CONFIG_ID
     # )
 
-    request_blocking = QgsBlockingNetworkRequest()
-
-    if method == "get":
-        _ = request_blocking.get(req)
-    elif method == "post":
-        if data:
-            # Support JSON
-            byte_data = bytes(json.dumps(data), "utf-8")
-            req.setRawHeader(
-                b"Content-Type",
-                bytes("application/json; charset=utf-8", "utf-8"),
-            )
-        else:
-            byte_data = b""
-        _ = request_blocking.post(req, byte_data)
-    else:
+    host = req.url().host()
+    rate_limiter = get_rate_limiter()
+
+    if method not in ("get", "post"):
         err_msg = f"Request method {method} not supported."
         raise NetworkException(err_msg)
 
-    reply: QgsNetworkReplyContent = request_blocking.reply()
+    byte_data = b""
+    if method == "post" and data:
+        # Support JSON
+        byte_data = bytes(json.dumps(data), "utf-8")
+        req.setRawHeader(
+            b"Content-Type",
+            bytes("application/json; charset=utf-8", "utf-8"),
+        )
+
+    try:
+        rate_limiter.acquire(host, priority, get_rate_limit_timeout())
+    except TimeoutError as e:
+        raise NetworkException(
+            str(e), bar_msg={"level": MessageLevel.WARNING}
+        ) from e
+
+    reply = session.send(req, method, byte_data)
+    rate_limiter.update_from_response(
+        host,
+        reply.attribute(QNetworkRequest.HttpStatusCodeAttribute),
+        get_reply_headers(reply),
+    )
     reply_error = reply.error()
     if reply_error != QNetworkReply.NoError:
         # Error content will be empty in older QGIS versions:
@@ -132,7 +340,7 @@ def request_raw(
         raise NetworkException(
             message=message,
             error=reply_error,
-            bar_msg=MessageBuilder.create_bar_message(reply.errorString()),
+            bar_msg={"message": reply.errorString()},
         )
 
     return bytes(reply.content())
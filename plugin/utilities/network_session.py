@@ -0,0 +1,392 @@
+"""Shared network session for plugin requests.
+
+QgsBlockingNetworkRequest sends requests of the main thread on a new thread
+with a new QgsNetworkAccessManager, so connections of those requests would
+never be reused. Session sends them on its own long-lived thread instead,
+whose network access manager keeps connections alive between requests.
+Requests of other threads are sent with the manager of that thread. Session
+sets the request attributes allowing HTTP/2 and pipelining, opens
+connections to configured hosts in advance on its thread and counts TLS
+handshakes to report how often connections are reused.
+"""
+
+import threading
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any, Literal, NamedTuple
+
+from qgis.core import (
+    QgsBlockingNetworkRequest,
+    QgsNetworkAccessManager,
+    QgsNetworkReplyContent,
+    QgsNetworkRequestParameters,
+)
+from qgis.PyQt.QtCore import (
+    QEventLoop,
+    QObject,
+    Qt,
+    QThread,
+    QUrl,
+    pyqtSignal,
+)
+from qgis.PyQt.QtNetwork import QNetworkReply, QNetworkRequest
+
+from plugin.exceptions import NetworkException
+from plugin.utilities.logger import get_plugin_logger
+from plugin.utilities.resources import get_plugin_name
+from plugin.utilities.settings import get_settings
+
+LOG = get_plugin_logger()
+
+HTTPS_PORT = 443
+HTTP_PORT = 80
+
+# Attributes were renamed from HTTP2* to Http2* in Qt 5.15
+HTTP2_ALLOWED_ATTRIBUTE = getattr(
+    QNetworkRequest,
+    "Http2AllowedAttribute",
+    getattr(QNetworkRequest, "HTTP2AllowedAttribute", None),
+)
+HTTP2_WAS_USED_ATTRIBUTE = getattr(
+    QNetworkRequest,
+    "Http2WasUsedAttribute",
+    getattr(QNetworkRequest, "HTTP2WasUsedAttribute", None),
+)
+
+
+class SessionStats(NamedTuple):
+    requests: int
+    encrypted_requests: int
+    handshakes: int
+    http2_responses: int
+
+    @property
+    def reuse_ratio(self) -> float | None:
+        """Share of encrypted requests that reused an existing connection.
+
+        Returns:
+            float | None: reuse ratio or None if there are no requests
+        """
+        if self.encrypted_requests == 0:
+            return None
+        reused = max(self.encrypted_requests - self.handshakes, 0)
+        return reused / self.encrypted_requests
+
+
+class PrewarmTarget(NamedTuple):
+    host: str
+    port: int
+    encrypted: bool
+
+
+def parse_prewarm_target(value: str) -> PrewarmTarget | None:
+    """Parse host to open a connection to.
+
+    Args:
+        value (str): host name with optional scheme and port, e.g.
+            `api.example.com` or `http://tiles.example.com:8080`. HTTPS is
+            used if scheme is missing.
+
+    Returns:
+        PrewarmTarget | None: connection target or None if value is invalid
+    """
+    url = QUrl(value if "://" in value else f"https://{value}")
+    scheme = url.scheme().lower()
+    if not url.isValid() or not url.host() or scheme not in ("http", "https"):
+        return None
+
+    encrypted = scheme == "https"
+    return PrewarmTarget(
+        url.host(),
+        url.port(HTTPS_PORT if encrypted else HTTP_PORT),
+        encrypted,
+    )
+
+
+class _Job(QObject):
+    """Function run on the session thread."""
+
+    finished = pyqtSignal()
+
+    def __init__(self, function: Callable[[], Any]) -> None:
+        super().__init__()
+        self.function = function
+        self.result: Any = None
+        self.error: Exception | None = None
+        self.done = False
+
+    def run(self) -> None:
+        try:
+            self.result = self.function()
+        except Exception as e:  # noqa: BLE001
+            # raised again on the waiting thread
+            self.error = e
+        self.done = True
+        self.finished.emit()
+
+
+class _JobRunner(QObject):
+    """Runs jobs on the thread it has been moved to."""
+
+    def run(self, job: _Job) -> None:
+        job.run()
+
+
+class NetworkSession(QObject):
+    """Sends plugin requests and keeps statistics of connection reuse.
+
+    QgsNetworkAccessManager instances are per thread, so connections are
+    reused only between requests sent on the same thread. Requests of the
+    main thread and prewarmed connections share the session thread.
+    """
+
+    job_submitted = pyqtSignal(object)
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._managers: list[QgsNetworkAccessManager] = []
+        self._requests = 0
+        self._encrypted_requests = 0
+        self._handshakes = 0
+        self._http2_responses = 0
+
+        self._thread: QThread | None = QThread()
+        self._thread.setObjectName(f"{get_plugin_name()}-network")
+        self._runner = _JobRunner()
+        self._runner.moveToThread(self._thread)
+        self._thread.finished.connect(self._runner.deleteLater)
+        self.job_submitted.connect(self._runner.run)
+        self._thread.start()
+
+    def prepare_request(self, req: QNetworkRequest) -> QNetworkRequest:
+        """Set headers and attributes shared by all plugin requests.
+
+        Args:
+            req (QNetworkRequest): request to configure
+
+        Returns:
+            QNetworkRequest: configured request
+        """
+        user_agent = get_settings().user_agent
+        req.setRawHeader(b"User-Agent", bytes(user_agent, "utf-8"))
+        req.setAttribute(
+            QgsNetworkRequestParameters.AttributeInitiatorClass,
+            get_plugin_name(),
+        )
+
+        if HTTP2_ALLOWED_ATTRIBUTE is not None:
+            req.setAttribute(HTTP2_ALLOWED_ATTRIBUTE, True)
+        req.setAttribute(QNetworkRequest.HttpPipeliningAllowedAttribute, True)
+
+        return req
+
+    def send(
+        self,
+        req: QNetworkRequest,
+        method: Literal["get", "post"] = "get",
+        data: bytes = b"",
+    ) -> QgsNetworkReplyContent:
+        """Send request with QgsBlockingNetworkRequest and wait for the
+        reply.
+
+        Requests made on the main thread are sent on the session thread
+        while the main thread processes events other than user input.
+
+        Args:
+            req (QNetworkRequest): request configured with prepare_request
+            method (Literal["get", "post"], optional): request method.
+                Defaults to "get".
+            data (bytes, optional): post request body. Defaults to b"".
+
+        Raises:
+            NetworkException: raised if the session is closed while the
+                request is waiting to be sent
+
+        Returns:
+            QgsNetworkReplyContent: reply of the request
+        """
+        if threading.current_thread() is threading.main_thread():
+            return self._run(lambda: self._send(req, method, data))
+        return self._send(req, method, data)
+
+    def prewarm(self, hosts: tuple[str, ...]) -> None:
+        """Open connections to hosts on the session thread so that first
+        requests of the main thread skip the connection setup and TLS
+        handshake. Does not wait for the connections.
+
+        Args:
+            hosts (tuple[str, ...]): hosts, see parse_prewarm_target
+        """
+        targets = []
+        for host in hosts:
+            target = parse_prewarm_target(host)
+            if target is None:
+                LOG.warning("Invalid prewarm host %s", host)
+                continue
+            targets.append(target)
+
+        if targets and self._thread is not None:
+            self.job_submitted.emit(_Job(lambda: self._connect(targets)))
+
+    def stats(self) -> SessionStats:
+        """Get connection reuse statistics.
+
+        Returns:
+            SessionStats: statistics since the session was created
+        """
+        with self._lock:
+            return SessionStats(
+                self._requests,
+                self._encrypted_requests,
+                self._handshakes,
+                self._http2_responses,
+            )
+
+    def log_stats(self) -> None:
+        """Log connection reuse statistics."""
+        stats = self.stats()
+        if stats.requests == 0:
+            return
+
+        reuse_ratio = stats.reuse_ratio
+        LOG.info(
+            "Network session: %s requests, %s TLS handshakes, "
+            "%s HTTP/2 responses, connection reuse ratio %s",
+            stats.requests,
+            stats.handshakes,
+            stats.http2_responses,
+            "-" if reuse_ratio is None else f"{reuse_ratio:.2f}",
+        )
+
+    def close(self) -> None:
+        """Stop counting TLS handshakes and stop the session thread."""
+        with self._lock:
+            managers = self._managers
+            self._managers = []
+
+        for manager in managers:
+            try:
+                manager.encrypted.disconnect(self._on_encrypted)
+            except (RuntimeError, TypeError):
+                # manager of a finished thread is already deleted
+                continue
+
+        thread = self._thread
+        self._thread = None
+        if thread is not None:
+            thread.quit()
+            thread.wait()
+
+    def _run(self, function: Callable[[], Any]) -> Any:
+        thread = self._thread
+        if thread is None:
+            return function()
+
+        loop = QEventLoop()
+        job = _Job(function)
+        # finished is queued to this thread, so it is handled only after
+        # the loop has started
+        job.finished.connect(loop.quit)
+        thread.finished.connect(loop.quit)
+        self.job_submitted.emit(job)
+        loop.exec(QEventLoop.ExcludeUserInputEvents)
+        thread.finished.disconnect(loop.quit)
+
+        if not job.done:
+            msg = "Network session was closed before the request was sent"
+            raise NetworkException(msg)
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _send(
+        self,
+        req: QNetworkRequest,
+        method: Literal["get", "post"],
+        data: bytes,
+    ) -> QgsNetworkReplyContent:
+        self._record_request(req)
+
+        request_blocking = QgsBlockingNetworkRequest()
+        if method == "get":
+            _ = request_blocking.get(req)
+        else:
+            _ = request_blocking.post(req, data)
+
+        reply = request_blocking.reply()
+        self._record_reply(reply)
+        return reply
+
+    def _connect(self, targets: list[PrewarmTarget]) -> None:
+        manager = QgsNetworkAccessManager.instance()
+        for target in targets:
+            LOG.debug("Prewarming connection to %s:%s", *target[:2])
+            if target.encrypted:
+                manager.connectToHostEncrypted(target.host, target.port)
+            else:
+                manager.connectToHost(target.host, target.port)
+
+    def _record_request(self, req: QNetworkRequest) -> None:
+        # called on the thread sending the request, so that handshakes are
+        # counted from the manager of that thread
+        self._watch_handshakes()
+
+        with self._lock:
+            self._requests += 1
+            if req.url().scheme().lower() == "https":
+                self._encrypted_requests += 1
+
+    def _record_reply(self, reply: QgsNetworkReplyContent) -> None:
+        if HTTP2_WAS_USED_ATTRIBUTE is None:
+            return
+
+        if reply.attribute(HTTP2_WAS_USED_ATTRIBUTE):
+            with self._lock:
+                self._http2_responses += 1
+
+    def _watch_handshakes(self) -> None:
+        if getattr(self._local, "watching", False):
+            return
+
+        # encrypted is emitted only when a new TLS connection is set up,
+        # requests reusing a connection do not emit it
+        manager = QgsNetworkAccessManager.instance()
+        manager.encrypted.connect(self._on_encrypted, Qt.DirectConnection)
+        self._local.watching = True
+
+        with self._lock:
+            self._managers.append(manager)
+
+    def _on_encrypted(self, reply: QNetworkReply) -> None:
+        initiator = reply.request().attribute(
+            QgsNetworkRequestParameters.AttributeInitiatorClass
+        )
+        if initiator != get_plugin_name():
+            return
+
+        with self._lock:
+            self._handshakes += 1
+
+
+@lru_cache
+def get_network_session() -> NetworkSession:
+    """Get network session shared by all plugin requests.
+
+    Returns:
+        NetworkSession: network session
+    """
+    return NetworkSession()
+
+
+def close_network_session() -> None:
+    """Log statistics and close the shared network session."""
+    if get_network_session.cache_info().currsize == 0:
+        return
+
+    session = get_network_session()
+    session.log_stats()
+    session.close()
+    get_network_session.cache_clear()
@@ -0,0 +1,475 @@
+"""CPU-bound jobs executed in the plugin process pool.
+
+This module is imported by plain Python worker processes that do not have
+QGIS available, so it must not import qgis or any plugin module that does.
+Job results are passed back to the plugin as compact binary buffers (WKB
+geometries, UTF-8 strings and NumPy attribute arrays) in memory-mapped
+files instead of pickled Python objects.
+"""
+
+import json
+import os
+import struct
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+
+RESULT_FILE_PREFIX = "plugin-result-"
+ALIGNMENT = 8
+VALID_COLUMN = "_valid"
+
+XY = 2
+XYZ = 3
+WKB_Z_OFFSET = 1000
+MIN_LINE_VERTICES = 2
+MIN_RING_VERTICES = 4
+MIN_SIMPLIFIED_VERTICES = 3
+
+WKB_TYPES = {
+    "Point": 1,
+    "LineString": 2,
+    "Polygon": 3,
+    "MultiPoint": 4,
+    "MultiLineString": 5,
+    "MultiPolygon": 6,
+    "GeometryCollection": 7,
+}
+
+
+class StringColumn(NamedTuple):
+    """String attribute column as a single UTF-8 buffer.
+
+    Value i is data[offsets[i] : offsets[i + 1]] decoded as UTF-8, or None
+    if nulls[i] is True.
+    """
+
+    data: bytes
+    offsets: np.ndarray
+    nulls: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def value(self, index: int) -> str | None:
+        """Get a single value.
+
+        Args:
+            index (int): value index
+
+        Returns:
+            str | None: decoded value or None for null
+        """
+        if self.nulls[index]:
+            return None
+
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.data[start:end].decode("utf-8")
+
+    def tolist(self) -> list[str | None]:
+        """Get all values.
+
+        Returns:
+            list[str | None]: decoded values
+        """
+        return [self.value(index) for index in range(len(self))]
+
+
+Column = np.ndarray | StringColumn
+
+
+class BinaryResult(NamedTuple):
+    """Geometries and attributes of a job in compact binary form.
+
+    Geometry i is wkb[wkb_offsets[i] : wkb_offsets[i + 1]]. Empty WKB means
+    that the feature has no geometry.
+    """
+
+    wkb: bytes
+    wkb_offsets: np.ndarray
+    attributes: dict[str, Column]
+
+    def __len__(self) -> int:
+        return len(self.wkb_offsets) - 1
+
+    def geometry_wkb(self, index: int) -> bytes:
+        """Get WKB of a single geometry.
+
+        Args:
+            index (int): geometry index
+
+        Returns:
+            bytes: WKB of the geometry
+        """
+        start, end = self.wkb_offsets[index], self.wkb_offsets[index + 1]
+        return self.wkb[start:end]
+
+
+class ResultHandle(NamedTuple):
+    """Location and layout of a job result written into a file.
+
+    Only this handle is pickled between the processes.
+    """
+
+    path: str
+    layout: list[tuple[str, str, tuple[int, ...], int]]
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_result(result: BinaryResult) -> ResultHandle:
+    """Write job result into a temporary file.
+
+    Args:
+        result (BinaryResult): job result
+
+    Returns:
+        ResultHandle: handle for reading the result in the plugin process
+    """
+    arrays: dict[str, np.ndarray] = {
+        "wkb": np.frombuffer(result.wkb, dtype=np.uint8),
+        "wkb_offsets": np.ascontiguousarray(result.wkb_offsets, np.int64),
+    }
+    for name, values in result.attributes.items():
+        if isinstance(values, StringColumn):
+            arrays[f"string:{name}"] = np.frombuffer(
+                values.data, dtype=np.uint8
+            )
+            arrays[f"string_offsets:{name}"] = np.ascontiguousarray(
+                values.offsets, np.int64
+            )
+            arrays[f"string_nulls:{name}"] = np.ascontiguousarray(
+                values.nulls, bool
+            )
+        else:
+            arrays[f"attribute:{name}"] = np.ascontiguousarray(values)
+
+    layout = []
+    file_descriptor, path = tempfile.mkstemp(prefix=RESULT_FILE_PREFIX)
+    with os.fdopen(file_descriptor, "wb") as result_file:
+        offset = 0
+        for key, array in arrays.items():
+            padding = _align(offset) - offset
+            result_file.write(b"\0" * padding)
+            offset += padding
+
+            layout.append((key, array.dtype.str, array.shape, offset))
+            result_file.write(array.reshape(-1).view(np.uint8).data)
+            offset += array.nbytes
+
+    return ResultHandle(path, layout)
+
+
+def read_result(handle: ResultHandle) -> BinaryResult:
+    """Read job result written by a worker process and remove the file.
+
+    Every array and buffer is copied out of the mapping exactly once, so the
+    file can be removed right away.
+
+    Args:
+        handle (ResultHandle): handle returned by the worker
+
+    Returns:
+        BinaryResult: job result
+    """
+    path = Path(handle.path)
+    try:
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        arrays: dict[str, np.ndarray] = {}
+        buffers: dict[str, bytes] = {}
+        for key, dtype, shape, offset in handle.layout:
+            count = int(np.prod(shape, dtype=np.int64))
+            if key == "wkb" or key.startswith("string:"):
+                buffers[key] = data[offset : offset + count].tobytes()
+            else:
+                arrays[key] = np.array(
+                    np.frombuffer(
+                        data, dtype=dtype, count=count, offset=offset
+                    ).reshape(shape)
+                )
+        # release the mapping before removing the file
+        del data
+    finally:
+        path.unlink(missing_ok=True)
+
+    attributes: dict[str, Column] = {}
+    for key, _, _, _ in handle.layout:
+        kind, _, name = key.partition(":")
+        if kind == "attribute":
+            attributes[name] = arrays[key]
+        elif kind == "string":
+            attributes[name] = StringColumn(
+                buffers[key],
+                arrays[f"string_offsets:{name}"],
+                arrays[f"string_nulls:{name}"],
+            )
+
+    return BinaryResult(
+        wkb=buffers["wkb"],
+        wkb_offsets=arrays["wkb_offsets"],
+        attributes=attributes,
+    )
+
+
+def run_job(
+    job: Callable[..., BinaryResult], *args: Any, **kwargs: Any
+) -> ResultHandle:
+    """Run job in a worker process and write its result into a file.
+
+    Args:
+        job (Callable[..., BinaryResult]): job function
+
+    Returns:
+        ResultHandle: handle for reading the result in the plugin process
+    """
+    return write_result(job(*args, **kwargs))
+
+
+def simplify_coordinates(
+    coordinates: np.ndarray, tolerance: float
+) -> np.ndarray:
+    """Simplify a coordinate sequence with Douglas-Peucker algorithm.
+
+    Args:
+        coordinates (np.ndarray): coordinates with shape (n, dimension)
+        tolerance (float): maximum distance of removed vertices from the
+            simplified line
+
+    Returns:
+        np.ndarray: simplified coordinates. First and last vertex are
+            always kept.
+    """
+    if tolerance <= 0 or len(coordinates) < MIN_SIMPLIFIED_VERTICES:
+        return coordinates
+
+    xy = coordinates[:, :2]
+    keep = np.zeros(len(coordinates), dtype=bool)
+    keep[[0, -1]] = True
+
+    stack = [(0, len(coordinates) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first <= 1:
+            continue
+
+        start, end = xy[first], xy[last]
+        segment = end - start
+        points = xy[first + 1 : last] - start
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(points[:, 0], points[:, 1])
+        else:
+            distances = (
+                np.abs(segment[0] * points[:, 1] - segment[1] * points[:, 0])
+                / length
+            )
+
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            split = first + 1 + index
+            keep[split] = True
+            stack.extend(((first, split), (split, last)))
+
+    return coordinates[keep]
+
+
+def _is_valid_ring(ring: np.ndarray) -> bool:
+    return len(ring) >= MIN_RING_VERTICES and bool(np.all(ring[0] == ring[-1]))
+
+
+def _coordinate_dimension(coordinates: list) -> int:
+    while coordinates and isinstance(coordinates[0], list):
+        coordinates = coordinates[0]
+    return XYZ if len(coordinates) >= XYZ else XY
+
+
+def _points(values: list, dimension: int) -> np.ndarray:
+    return np.asarray(
+        [value[:dimension] for value in values], dtype="<f8"
+    ).reshape(-1, dimension)
+
+
+def _line_body(
+    values: list, dimension: int, tolerance: float
+) -> tuple[bytes, bool]:
+    line = simplify_coordinates(_points(values, dimension), tolerance)
+    return (
+        struct.pack("<I", len(line)) + line.tobytes(),
+        len(line) >= MIN_LINE_VERTICES,
+    )
+
+
+def _polygon_body(
+    rings: list, dimension: int, tolerance: float
+) -> tuple[bytes, bool]:
+    arrays = [
+        simplify_coordinates(_points(ring, dimension), tolerance)
+        for ring in rings
+    ]
+    return (
+        struct.pack("<I", len(arrays))
+        + b"".join(
+            struct.pack("<I", len(ring)) + ring.tobytes() for ring in arrays
+        ),
+        bool(arrays) and all(_is_valid_ring(ring) for ring in arrays),
+    )
+
+
+def _geometry_to_wkb(
+    geometry: dict[str, Any], tolerance: float
+) -> tuple[bytes, bool]:
+    """Convert GeoJSON geometry into little endian ISO WKB.
+
+    Args:
+        geometry (dict[str, Any]): GeoJSON geometry object
+        tolerance (float): simplification tolerance. Zero disables
+            simplification.
+
+    Raises:
+        ValueError: raised if geometry type is not supported
+
+    Returns:
+        tuple[bytes, bool]: WKB and whether the geometry is valid
+    """
+    geometry_type = geometry["type"]
+    if geometry_type not in WKB_TYPES:
+        msg = f"Unsupported GeoJSON geometry type {geometry_type}"
+        raise ValueError(msg)
+
+    if geometry_type == "GeometryCollection":
+        parts = [
+            _geometry_to_wkb(part, tolerance)
+            for part in geometry["geometries"]
+        ]
+        header = struct.pack("<BII", 1, WKB_TYPES[geometry_type], len(parts))
+        return (
+            header + b"".join(wkb for wkb, _ in parts),
+            all(valid for _, valid in parts),
+        )
+
+    coordinates = geometry["coordinates"]
+    dimension = _coordinate_dimension(coordinates)
+    z_offset = WKB_Z_OFFSET if dimension == XYZ else 0
+
+    if geometry_type == "Point":
+        body = _points([coordinates], dimension).tobytes(), True
+    elif geometry_type == "LineString":
+        body = _line_body(coordinates, dimension, tolerance)
+    elif geometry_type == "Polygon":
+        body = _polygon_body(coordinates, dimension, tolerance)
+    else:
+        part_type = geometry_type.removeprefix("Multi")
+        parts = [
+            _geometry_to_wkb(
+                {"type": part_type, "coordinates": part}, tolerance
+            )
+            for part in coordinates
+        ]
+        body = (
+            struct.pack("<I", len(parts)) + b"".join(p[0] for p in parts),
+            all(p[1] for p in parts),
+        )
+
+    type_code = WKB_TYPES[geometry_type] + z_offset
+    return struct.pack("<BI", 1, type_code) + body[0], body[1]
+
+
+def _to_column(values: list[Any]) -> Column:
+    present = [value for value in values if value is not None]
+
+    if present and all(isinstance(value, bool) for value in present):
+        if len(present) == len(values):
+            return np.asarray(values, dtype=bool)
+        return np.asarray(
+            [np.nan if v is None else float(v) for v in values], dtype="<f8"
+        )
+
+    if present and all(
+        isinstance(value, int) and not isinstance(value, bool)
+        for value in present
+    ):
+        if len(present) == len(values):
+            return np.asarray(values, dtype="<i8")
+        return np.asarray(
+            [np.nan if v is None else v for v in values], dtype="<f8"
+        )
+
+    if present and all(
+        isinstance(value, int | float) and not isinstance(value, bool)
+        for value in present
+    ):
+        return np.asarray(
+            [np.nan if v is None else v for v in values], dtype="<f8"
+        )
+
+    encoded = [
+        b""
+        if v is None
+        else (
+            v if isinstance(v, str) else json.dumps(v, ensure_ascii=False)
+        ).encode("utf-8")
+        for v in values
+    ]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+
+    return StringColumn(
+        b"".join(encoded),
+        offsets,
+        np.asarray([v is None for v in values], dtype=bool),
+    )
+
+
+def decode_geojson(
+    payload: bytes, simplify_tolerance: float = 0.0
+) -> BinaryResult:
+    """Decode GeoJSON feature collection into WKB and attribute arrays.
+
+    Geometries are optionally simplified and validated. Validation result
+    is returned in the boolean attribute column `_valid`. String and JSON
+    valued properties are returned as StringColumn.
+
+    Args:
+        payload (bytes): GeoJSON feature collection
+        simplify_tolerance (float, optional): simplification tolerance in
+            coordinate units. Defaults to 0.0 which disables simplification.
+
+    Returns:
+        BinaryResult: geometries and attributes of the features
+    """
+    features = json.loads(payload).get("features", [])
+
+    wkb_parts: list[bytes] = []
+    offsets = [0]
+    valid: list[bool] = []
+    columns: dict[str, list[Any]] = {}
+
+    for index, feature in enumerate(features):
+        geometry = feature.get("geometry")
+        if geometry is None:
+            wkb, is_valid = b"", True
+        else:
+            wkb, is_valid = _geometry_to_wkb(geometry, simplify_tolerance)
+
+        wkb_parts.append(wkb)
+        offsets.append(offsets[-1] + len(wkb))
+        valid.append(is_valid)
+
+        properties = feature.get("properties") or {}
+        for name in properties.keys() - columns.keys():
+            columns[name] = [None] * index
+        for name, values in columns.items():
+            values.append(properties.get(name))
+
+    attributes = {name: _to_column(values) for name, values in columns.items()}
+    attributes[VALID_COLUMN] = np.asarray(valid, dtype=bool)
+
+    return BinaryResult(
+        wkb=b"".join(wkb_parts),
+        wkb_offsets=np.asarray(offsets, dtype=np.int64),
+        attributes=attributes,
+    )
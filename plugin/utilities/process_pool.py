@@ -0,0 +1,188 @@
+"""Process pool for CPU-bound jobs that are limited by the GIL in threads."""
+
+import multiprocessing
+import multiprocessing.spawn
+import os
+import shutil
+import sys
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from plugin.exceptions import ConfigurationException
+from plugin.utilities.logger import get_plugin_logger
+from plugin.utilities.process_jobs import (
+    BinaryResult,
+    ResultHandle,
+    read_result,
+    run_job,
+)
+from plugin.utilities.settings import get_settings
+
+LOG = get_plugin_logger()
+
+_POOL: "ProcessPool | None" = None
+_SPAWN_LOCK = threading.Lock()
+
+
+def get_python_executable() -> str:
+    """Get Python interpreter used for starting worker processes.
+
+    Inside QGIS sys.executable points to the QGIS binary, so the interpreter
+    of the QGIS Python installation is looked up instead.
+
+    Raises:
+        ConfigurationException: raised if Python interpreter cannot be found
+
+    Returns:
+        str: path to Python interpreter
+    """
+    configured = get_settings().python_executable
+    if configured:
+        return configured
+
+    if Path(sys.executable).name.lower().startswith("python"):
+        return sys.executable
+
+    name = "python.exe" if sys.platform == "win32" else "python3"
+    for candidate in (
+        Path(sys.exec_prefix) / name,
+        Path(sys.exec_prefix) / "bin" / name,
+    ):
+        if candidate.exists():
+            return str(candidate)
+
+    found = shutil.which(name)
+    if found:
+        return found
+
+    err_msg = (
+        "Python interpreter for worker processes not found. "
+        "Set environment variable PLUGIN_PYTHON_EXECUTABLE"
+    )
+    raise ConfigurationException(err_msg)
+
+
+def get_process_count() -> int:
+    """Get number of worker processes.
+
+    Returns:
+        int: process count from settings or CPU count
+    """
+    return get_settings().process_count or os.cpu_count() or 1
+
+
+class ProcessPool:
+    """Pool of worker processes for CPU-bound jobs.
+
+    Jobs must be module level functions of a module that does not import
+    qgis, e.g. functions of `plugin.utilities.process_jobs`. Job returns
+    BinaryResult which is passed back through a memory-mapped file.
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        """Initialize the pool. Worker processes are started on demand.
+
+        Args:
+            max_workers (int | None, optional): number of worker processes.
+                Values below one default to get_process_count(). Defaults to
+                None.
+        """
+        self.executable = get_python_executable()
+        self.max_workers = (
+            max_workers
+            if max_workers is not None and max_workers > 0
+            else get_process_count()
+        )
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def submit(
+        self,
+        job: Callable[..., BinaryResult],
+        *args: Any,
+        **kwargs: Any,
+    ) -> "Future[BinaryResult]":
+        """Submit job to be run in a worker process.
+
+        Args:
+            job (Callable[..., BinaryResult]): job function
+
+        Returns:
+            Future[BinaryResult]: future for the job result
+        """
+        future: Future[BinaryResult] = Future()
+
+        def read_handle(handle_future: "Future[ResultHandle]") -> None:
+            try:
+                future.set_result(read_result(handle_future.result()))
+            except BaseException as e:  # noqa: BLE001
+                future.set_exception(e)
+
+        # Workers are started on demand when jobs are submitted. Spawn
+        # executable is global to the whole QGIS process, so it is set only
+        # while our workers may be started and restored right after.
+        with _SPAWN_LOCK:
+            previous_executable = multiprocessing.spawn.get_executable()
+            multiprocessing.spawn.set_executable(self.executable)
+            try:
+                handle_future = self._executor.submit(
+                    run_job, job, *args, **kwargs
+                )
+            finally:
+                multiprocessing.spawn.set_executable(previous_executable)
+
+        handle_future.add_done_callback(read_handle)
+
+        return future
+
+    def map(
+        self,
+        job: Callable[..., BinaryResult],
+        payloads: Iterable[Any],
+        **kwargs: Any,
+    ) -> Iterator[BinaryResult]:
+        """Run job for each payload in parallel.
+
+        Args:
+            job (Callable[..., BinaryResult]): job function
+            payloads (Iterable[Any]): first argument of each job call
+
+        Yields:
+            Iterator[BinaryResult]: job results in the payload order
+        """
+        futures = [self.submit(job, payload, **kwargs) for payload in payloads]
+        for future in futures:
+            yield future.result()
+
+    def shutdown(self) -> None:
+        """Stop worker processes and cancel pending jobs."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def get_process_pool() -> ProcessPool:
+    """Get shared plugin process pool.
+
+    Returns:
+        ProcessPool: process pool
+    """
+    global _POOL  # noqa: PLW0603
+
+    if _POOL is None:
+        _POOL = ProcessPool()
+        LOG.debug("Process pool with %d workers created", _POOL.max_workers)
+
+    return _POOL
+
+
+def shutdown_process_pool() -> None:
+    """Shutdown shared plugin process pool if it has been created."""
+    global _POOL  # noqa: PLW0603
+
+    if _POOL is not None:
+        _POOL.shutdown()
+        _POOL = None
@@ -0,0 +1,379 @@
+"""Per-host token bucket rate limiting of network requests."""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections.abc import Callable, Mapping
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import NamedTuple
+
+TOO_MANY_REQUESTS = 429
+SERVICE_UNAVAILABLE = 503
+DEFAULT_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+MAX_BLOCK_SECONDS = 300.0
+# Reset header values above this are Unix timestamps instead of seconds
+RESET_EPOCH_THRESHOLD = 1_000_000_000
+
+WILDCARD_HOST = "*"
+
+
+class RequestPriority(IntEnum):
+    """Request priority class. Lower value is served first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class RateLimit(NamedTuple):
+    rate: float
+    capacity: float
+
+
+class QuotaState(NamedTuple):
+    host: str
+    rate: float
+    capacity: float
+    tokens: float
+    limit: int | None
+    remaining: int | None
+    reset_in: float | None
+    blocked_for: float
+    waiting: int
+
+
+class _HostState:
+    def __init__(self, limit: RateLimit, now: float) -> None:
+        self.limit = limit
+        self.tokens = limit.capacity
+        self.updated_at = now
+
+        self.server_limit: int | None = None
+        self.server_remaining: int | None = None
+        self.server_rate: float | None = None
+        self.reset_at: float | None = None
+        self.blocked_until = 0.0
+        self.backoff = DEFAULT_BACKOFF_SECONDS
+
+        self.waiters: list[tuple[int, int]] = []
+
+    @property
+    def rate(self) -> float:
+        if self.server_rate is None:
+            return self.limit.rate
+        return min(self.limit.rate, self.server_rate)
+
+    def refill(self, now: float) -> None:
+        if self.reset_at is not None and now >= self.reset_at:
+            self.server_rate = None
+            self.server_remaining = None
+            self.reset_at = None
+
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        if math.isinf(self.rate):
+            self.tokens = self.limit.capacity
+        elif elapsed > 0:
+            self.tokens = min(
+                self.limit.capacity, self.tokens + elapsed * self.rate
+            )
+
+    def wait_time(self, now: float) -> float:
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (1 - self.tokens) / self.rate
+
+    def block(self, now: float, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        self.tokens = min(self.tokens, 0.0)
+
+
+def parse_retry_after(value: str, now: float | None = None) -> float | None:
+    """Parse Retry-After header value.
+
+    Args:
+        value (str): delay in seconds or HTTP date
+        now (float | None, optional): current unix time. Defaults to
+            time.time().
+
+    Returns:
+        float | None: delay in seconds or None if value is invalid
+    """
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+    return max(retry_at - (time.time() if now is None else now), 0.0)
+
+
+def _header_int(headers: Mapping[str, str], *names: str) -> int | None:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            # Structured header values may contain parameters, e.g. "100;w=60"
+            return int(float(value.split(";")[0].split(",")[0]))
+        except ValueError:
+            continue
+    return None
+
+
+class HostRateLimiter:
+    """Token bucket rate limiter with separate buckets for each host.
+
+    Waiting requests of a host are served in priority order, so interactive
+    requests go ahead of background requests. Limits adapt to the
+    RateLimit-* and Retry-After response headers and to 429 and 503
+    responses.
+    """
+
+    def __init__(
+        self,
+        default_limit: RateLimit | None = None,
+        host_limits: Mapping[str, RateLimit] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            default_limit (RateLimit | None, optional): limit of hosts
+                without their own limit. Defaults to no limit.
+            host_limits (Mapping[str, RateLimit] | None, optional): limits
+                by host name. Defaults to None.
+            clock (Callable[[], float], optional): monotonic clock in
+                seconds. Defaults to time.monotonic.
+            wall_clock (Callable[[], float], optional): Unix time for
+                absolute reset and Retry-After values. Defaults to
+                time.time.
+        """
+        self.default_limit = default_limit or RateLimit(math.inf, 1.0)
+        self.host_limits = dict(host_limits or {})
+        self.clock = clock
+        self.wall_clock = wall_clock
+
+        self._condition = threading.Condition()
+        self._hosts: dict[str, _HostState] = {}
+        self._sequence = itertools.count()
+
+    def configure(
+        self,
+        default_limit: RateLimit | None = None,
+        host_limits: Mapping[str, RateLimit] | None = None,
+    ) -> None:
+        """Replace configured limits. Adapted server limits are kept.
+
+        Args:
+            default_limit (RateLimit | None, optional): limit of hosts
+                without their own limit. Defaults to no limit.
+            host_limits (Mapping[str, RateLimit] | None, optional): limits
+                by host name. Defaults to None.
+        """
+        with self._condition:
+            self.default_limit = default_limit or RateLimit(math.inf, 1.0)
+            self.host_limits = dict(host_limits or {})
+            for host, state in self._hosts.items():
+                state.limit = self._limit_for(host)
+                state.tokens = min(state.tokens, state.limit.capacity)
+            self._condition.notify_all()
+
+    def acquire(
+        self,
+        host: str,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        timeout: float | None = None,
+    ) -> None:
+        """Wait until a request can be sent to the host.
+
+        Args:
+            host (str): host name
+            priority (RequestPriority, optional): request priority.
+                Defaults to RequestPriority.INTERACTIVE.
+            timeout (float | None, optional): maximum time to wait in
+                seconds. Defaults to None.
+
+        Raises:
+            TimeoutError: raised if request could not be sent in time
+        """
+        with self._condition:
+            state = self._host(host)
+            ticket = (int(priority), next(self._sequence))
+            heapq.heappush(state.waiters, ticket)
+            deadline = None if timeout is None else self.clock() + timeout
+
+            try:
+                while True:
+                    now = self.clock()
+                    state.refill(now)
+                    wait = state.wait_time(now)
+
+                    if state.waiters[0] == ticket and wait <= 0:
+                        state.tokens -= 1
+                        return
+
+                    if state.waiters[0] != ticket:
+                        wait = math.inf
+                    if deadline is not None:
+                        # fail right away if the wait is known to be too long
+                        if now >= deadline or (
+                            state.waiters[0] == ticket
+                            and now + wait > deadline
+                        ):
+                            msg = f"Rate limit of {host} exceeded"
+                            raise TimeoutError(msg)
+                        wait = min(wait, deadline - now)
+
+                    self._condition.wait(None if math.isinf(wait) else wait)
+            finally:
+                state.waiters.remove(ticket)
+                heapq.heapify(state.waiters)
+                self._condition.notify_all()
+
+    def update_from_response(
+        self,
+        host: str,
+        status_code: int | None,
+        headers: Mapping[str, str],
+    ) -> None:
+        """Adapt host limits to response status and rate limit headers.
+
+        Reset values can be either seconds or Unix timestamps. Blocks set by
+        the headers are capped at MAX_BLOCK_SECONDS.
+
+        Args:
+            host (str): host name
+            status_code (int | None): HTTP status code
+            headers (Mapping[str, str]): response headers with lower case
+                names
+        """
+        with self._condition:
+            state = self._host(host)
+            now = self.clock()
+            state.refill(now)
+
+            limit = _header_int(
+                headers, "ratelimit-limit", "x-ratelimit-limit"
+            )
+            remaining = _header_int(
+                headers, "ratelimit-remaining", "x-ratelimit-remaining"
+            )
+            reset = _header_int(
+                headers, "ratelimit-reset", "x-ratelimit-reset"
+            )
+            retry_after = (
+                parse_retry_after(headers["retry-after"], self.wall_clock())
+                if "retry-after" in headers
+                else None
+            )
+            if reset is not None and reset > RESET_EPOCH_THRESHOLD:
+                reset = max(math.ceil(reset - self.wall_clock()), 0)
+
+            if limit is not None:
+                state.server_limit = limit
+            if remaining is not None:
+                state.server_remaining = remaining
+                state.tokens = min(state.tokens, float(remaining))
+            if reset is not None and remaining is not None:
+                state.reset_at = now + reset
+                if remaining <= 0:
+                    state.block(now, min(reset, MAX_BLOCK_SECONDS))
+                elif reset > 0:
+                    # spread the remaining quota over the reset window
+                    state.server_rate = remaining / reset
+
+            if retry_after is not None:
+                state.block(now, min(retry_after, MAX_BLOCK_SECONDS))
+            elif status_code in (TOO_MANY_REQUESTS, SERVICE_UNAVAILABLE):
+                state.block(now, state.backoff)
+                state.backoff = min(state.backoff * 2, MAX_BACKOFF_SECONDS)
+
+            if status_code not in (TOO_MANY_REQUESTS, SERVICE_UNAVAILABLE):
+                state.backoff = DEFAULT_BACKOFF_SECONDS
+
+            self._condition.notify_all()
+
+    def quota_state(self, host: str) -> QuotaState:
+        """Get current quota state of the host.
+
+        Args:
+            host (str): host name
+
+        Returns:
+            QuotaState: quota state
+        """
+        with self._condition:
+            state = self._host(host)
+            now = self.clock()
+            state.refill(now)
+
+            return QuotaState(
+                host=host,
+                rate=state.rate,
+                capacity=state.limit.capacity,
+                tokens=state.tokens,
+                limit=state.server_limit,
+                remaining=state.server_remaining,
+                reset_in=(
+                    max(state.reset_at - now, 0.0)
+                    if state.reset_at is not None
+                    else None
+                ),
+                blocked_for=max(state.blocked_until - now, 0.0),
+                waiting=len(state.waiters),
+            )
+
+    def _limit_for(self, host: str) -> RateLimit:
+        return self.host_limits.get(host, self.default_limit)
+
+    def _host(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(self._limit_for(host), self.clock())
+            self._hosts[host] = state
+        return state
+
+
+def parse_rate_limits(value: str) -> dict[str, RateLimit]:
+    """Parse rate limit configuration.
+
+    Configuration is a semicolon separated list of
+    `<host>=<requests per second>[:<burst size>]` items, e.g.
+    `api.example.com=10:20;*=50`. Host `*` sets the default limit.
+
+    Args:
+        value (str): rate limit configuration
+
+    Returns:
+        dict[str, RateLimit]: limits by host name
+    """
+    limits: dict[str, RateLimit] = {}
+
+    for item in value.split(";"):
+        host, separator, limit = item.strip().partition("=")
+        if not separator:
+            continue
+
+        rate, _, capacity = limit.partition(":")
+        try:
+            limits[host.strip()] = RateLimit(
+                float(rate),
+                float(capacity) if capacity else max(float(rate), 1.0),
+            )
+        except ValueError:
+            continue
+
+    return limits
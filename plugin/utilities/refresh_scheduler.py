@@ -0,0 +1,147 @@
+"""Coalesced map canvas refreshes for plugin operations.
+
+Plugin operations request repaints of the layers they changed instead of
+refreshing the whole canvas. Requests made within a frame window are
+collected and only the affected layers are repainted, with at most one
+full canvas refresh per window.
+"""
+
+import threading
+
+from qgis.core import QgsMapLayer, QgsProject
+from qgis.PyQt.QtCore import QObject, QTimer, pyqtSignal
+from qgis.utils import iface
+
+from plugin.exceptions import GenericException
+
+FRAME_WINDOW_MS = 40
+
+_scheduler: "RefreshScheduler | None" = None
+
+
+class RefreshScheduler(QObject):
+    """Collects repaint requests and flushes them once per frame window.
+
+    Scheduler must be created on the main thread. Requests can be made from
+    any thread, the queued signal connection moves the flush to the main
+    thread.
+    """
+
+    refresh_requested = pyqtSignal()
+
+    def __init__(self, frame_window_ms: int = FRAME_WINDOW_MS) -> None:
+        super().__init__()
+
+        self._lock = threading.Lock()
+        self._layer_ids: set[str] = set()
+        self._canvas_refresh = False
+        self._flush_requested = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(frame_window_ms)
+        self._timer.timeout.connect(self.flush)
+
+        self.refresh_requested.connect(self._start_timer)
+
+    def request_repaint(self, layer: QgsMapLayer | str) -> None:
+        """Repaint layer in the next flush.
+
+        Args:
+            layer (QgsMapLayer | str): layer or layer id
+        """
+        layer_id = layer if isinstance(layer, str) else layer.id()
+
+        with self._lock:
+            self._layer_ids.add(layer_id)
+            self._request_flush()
+
+    def request_canvas_refresh(self) -> None:
+        """Refresh the whole map canvas in the next flush.
+
+        Use only when the change cannot be targeted to layers, e.g. after
+        removing a layer.
+        """
+        with self._lock:
+            self._canvas_refresh = True
+            self._request_flush()
+
+    def flush(self) -> None:
+        """Repaint requested layers and refresh canvas if requested."""
+        with self._lock:
+            layer_ids = self._layer_ids
+            canvas_refresh = self._canvas_refresh
+            self._layer_ids = set()
+            self._canvas_refresh = False
+            self._flush_requested = False
+
+        if canvas_refresh:
+            # full refresh re-renders the targeted layers too
+            if iface is not None:
+                iface.mapCanvas().refresh()
+            return
+
+        project = QgsProject.instance()
+        for layer_id in layer_ids:
+            layer = project.mapLayer(layer_id)
+            if layer is not None:
+                layer.triggerRepaint()
+
+    def stop(self) -> None:
+        """Stop pending flush and drop requests."""
+        self._timer.stop()
+        with self._lock:
+            self._layer_ids = set()
+            self._canvas_refresh = False
+            self._flush_requested = False
+
+    def _request_flush(self) -> None:
+        if not self._flush_requested:
+            self._flush_requested = True
+            self.refresh_requested.emit()
+
+    def _start_timer(self) -> None:
+        self._timer.start()
+
+
+def install_refresh_scheduler() -> None:
+    """Create shared refresh scheduler. Must be called on the main thread.
+
+    Raises:
+        GenericException: raised if called from another thread
+    """
+    global _scheduler  # noqa: PLW0603
+
+    if threading.current_thread() is not threading.main_thread():
+        msg = "Refresh scheduler must be installed on the main thread"
+        raise GenericException(msg)
+
+    if _scheduler is None:
+        _scheduler = RefreshScheduler()
+
+
+def get_refresh_scheduler() -> RefreshScheduler:
+    """Get shared refresh scheduler.
+
+    Raises:
+        GenericException: raised if the scheduler has not been installed
+
+    Returns:
+        RefreshScheduler: refresh scheduler
+    """
+    scheduler = _scheduler
+    if scheduler is None:
+        msg = "Refresh scheduler is not installed"
+        raise GenericException(msg)
+
+    return scheduler
+
+
+def uninstall_refresh_scheduler() -> None:
+    """Stop and remove shared refresh scheduler if it has been installed."""
+    global _scheduler  # noqa: PLW0603
+
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler.deleteLater()
+        _scheduler = None
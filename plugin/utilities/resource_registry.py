@@ -0,0 +1,143 @@
+"""Registry for plugin icons, UI and translation files.
+
+Resources are read from the compiled Qt resource bundle
+`resources/resources.rcc` when it exists. The bundle is created at packaging
+time with `scripts/compile-resources.sh` and memory-mapped by Qt when
+registered. Without the bundle, e.g. during development, resources are read
+from the loose files in the plugin directory.
+"""
+
+import io
+from functools import lru_cache
+from pathlib import Path
+
+from qgis.PyQt.QtCore import QFile, QIODevice, QResource
+from qgis.PyQt.QtGui import QIcon, QPixmap
+
+from plugin.utilities.logger import get_plugin_logger
+from plugin.utilities.resources import (
+    get_plugin_directory_path,
+    get_plugin_name,
+    get_resource_path,
+)
+
+LOG = get_plugin_logger()
+
+RESOURCE_BUNDLE = "resources.rcc"
+
+_registered_bundle: str | None = None
+
+
+def register_resource_bundle() -> bool:
+    """Register compiled resource bundle if it exists.
+
+    Returns:
+        bool: True if bundle was registered
+    """
+    global _registered_bundle  # noqa: PLW0603
+
+    if _registered_bundle is not None:
+        return True
+
+    bundle = get_resource_path(RESOURCE_BUNDLE)
+    if not bundle.exists():
+        LOG.debug("Resource bundle not found, using loose resource files")
+        return False
+
+    if not QResource.registerResource(str(bundle)):
+        LOG.warning("Registering resource bundle %s failed", bundle)
+        return False
+
+    _registered_bundle = str(bundle)
+    _clear_caches()
+
+    return True
+
+
+def unregister_resource_bundle() -> None:
+    """Unregister resource bundle and clear cached resources."""
+    global _registered_bundle  # noqa: PLW0603
+
+    if _registered_bundle is not None:
+        QResource.unregisterResource(_registered_bundle)
+        _registered_bundle = None
+
+    _clear_caches()
+
+
+def _clear_caches() -> None:
+    get_resource_file.cache_clear()
+    get_icon.cache_clear()
+    get_pixmap.cache_clear()
+
+
+@lru_cache
+def get_resource_file(key: str) -> str:
+    """Get path of a resource that Qt classes can read.
+
+    Args:
+        key (str): path of the resource relative to the plugin directory
+            e.g. "resources/icons/dog.png". Qt resource paths and absolute
+            file paths are returned as is.
+
+    Returns:
+        str: Qt resource path if resource is in the registered bundle,
+            otherwise file system path
+    """
+    if key.startswith(":") or Path(key).is_absolute():
+        return key
+
+    if _registered_bundle is not None:
+        resource_path = f":/{get_plugin_name()}/{key}"
+        if QFile.exists(resource_path):
+            return resource_path
+
+    return str(get_plugin_directory_path() / key)
+
+
+@lru_cache
+def get_icon(key: str) -> QIcon:
+    """Get cached icon.
+
+    Args:
+        key (str): resource key or path of the icon
+
+    Returns:
+        QIcon: icon
+    """
+    return QIcon(get_resource_file(key))
+
+
+@lru_cache
+def get_pixmap(key: str) -> QPixmap:
+    """Get cached pixmap.
+
+    Args:
+        key (str): resource key or path of the image
+
+    Returns:
+        QPixmap: pixmap
+    """
+    return QPixmap(get_resource_file(key))
+
+
+def open_resource(key: str) -> io.BytesIO:
+    """Read resource content e.g. for uic.loadUi.
+
+    Args:
+        key (str): resource key or path
+
+    Raises:
+        FileNotFoundError: raised if resource cannot be read
+
+    Returns:
+        io.BytesIO: resource content
+    """
+    resource_file = QFile(get_resource_file(key))
+    if not resource_file.open(QIODevice.ReadOnly):
+        raise FileNotFoundError(resource_file.fileName())
+
+    try:
+        return io.BytesIO(bytes(resource_file.readAll()))
+    finally:
+        resource_file.close()
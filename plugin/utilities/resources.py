@@ -88,6 +88,7 @@ def get_env_variable(
     return os.environ.get(variable_key, default_value)  # type: ignore
 
 
+@lru_cache
 def get_resource_path(filename: str) -> Path:
     """Get path to the resource file.
 
@@ -105,7 +106,7 @@ def get_resource_path(filename: str) -> Path:
 
 
 def get_profile() -> str:
-    """Get profile from environment variable
+    """Get profile from the settings snapshot
 
     Raises:
         QgisPluginConfigException:
@@ -113,11 +114,15 @@ def get_profile() -> str:
     Returns:
         str: profile name
     """
-    try:
-        return os.environ[ENV_VARIABLE_PROFILE]
-    except KeyError as e:
+    # imported here to avoid circular import, settings imports this module
+    from plugin.utilities.settings import get_settings
+
+    profile = get_settings().profile
+    if profile is None:
         err_msg = f"Ympäristömuuttujaa {ENV_VARIABLE_PROFILE} ei määritetty"
-        raise ConfigurationException(err_msg) from e
+        raise ConfigurationException(err_msg)
+
+    return profile
 
 
 @lru_cache
@@ -0,0 +1,185 @@
+"""Cached snapshot of plugin related QGIS settings and configuration."""
+
+import logging
+import threading
+from collections.abc import Callable
+from typing import NamedTuple
+
+from qgis.core import Qgis
+from qgis.PyQt.QtCore import QSettings
+
+from plugin.utilities.rate_limiter import RateLimit, parse_rate_limits
+from plugin.utilities.resources import (
+    ENV_VARIABLE_PROFILE,
+    get_env_variable,
+    get_plugin_name,
+)
+
+DEFAULT_USER_AGENT = "Mozilla/5.0"
+DEFAULT_FLIGHT_RECORDER_SIZE = 1000
+
+
+class PluginSettings(NamedTuple):
+    user_agent: str
+    locale: str
+    log_level: int
+    debugging_enabled: bool
+    file_logging_enabled: bool
+    flight_recorder_size: int
+    rate_limits: tuple[tuple[str, RateLimit], ...]
+    prewarm_hosts: tuple[str, ...]
+    process_count: int | None
+    python_executable: str | None
+    profile: str | None
+
+
+SettingsSubscriber = Callable[[PluginSettings], None]
+
+_lock = threading.Lock()
+_settings: PluginSettings | None = None
+_subscribers: list[SettingsSubscriber] = []
+
+
+def _read_user_agent(settings: QSettings) -> str:
+    # http://osgeo-org.1560.x6.nabble.com/QGIS-Developer-Do-we-have-a-User-Agent-string-for-QGIS-td5360740.html
+    user_agent = settings.value(
+        "/qgis/networkAndProxy/userAgent", DEFAULT_USER_AGENT
+    )
+    user_agent += " " if len(user_agent) else ""
+    user_agent += f"QGIS/{Qgis.QGIS_VERSION_INT}"
+    user_agent += f" {get_plugin_name()}"
+
+    return user_agent
+
+
+def _read_log_level(debugging_enabled: bool) -> int:
+    """Read logging level from environment variable.
+    Otherwise default to DEBUG if debugging is enabled and INFO if not.
+
+    https://docs.python.org/3/library/logging.html#levels
+
+    Args:
+        debugging_enabled (bool): whether plugin debugging is enabled
+
+    Returns:
+        int: logging level
+    """
+    implicit_log_level = logging.DEBUG if debugging_enabled else logging.INFO
+
+    try:
+        return int(get_env_variable("PLUGIN_LOG_LEVEL", ""))
+    except ValueError:
+        return implicit_log_level
+
+
+def _read_flight_recorder_size() -> int:
+    try:
+        return int(get_env_variable("PLUGIN_FLIGHT_RECORDER_SIZE", ""))
+    except ValueError:
+        return DEFAULT_FLIGHT_RECORDER_SIZE
+
+
+def _read_prewarm_hosts() -> tuple[str, ...]:
+    value = get_env_variable("PLUGIN_PREWARM_HOSTS", "")
+    return tuple(value.replace(",", " ").split())
+
+
+def _read_process_count() -> int | None:
+    try:
+        count = int(get_env_variable("PLUGIN_PROCESS_COUNT", ""))
+    except ValueError:
+        return None
+
+    return count if count > 0 else None
+
+
+def load_settings() -> PluginSettings:
+    """Read settings from QSettings and environment variables.
+
+    Returns:
+        PluginSettings: settings snapshot
+    """
+    settings = QSettings()
+    debugging_enabled = get_env_variable("PLUGIN_DEBUGGING_ENABLED") == "1"
+
+    return PluginSettings(
+        user_agent=_read_user_agent(settings),
+        locale=(settings.value("locale/userLocale") or "")[0:2],
+        log_level=_read_log_level(debugging_enabled),
+        debugging_enabled=debugging_enabled,
+        file_logging_enabled=get_env_variable("DEBUGGING_ENABLED") == "1",
+        flight_recorder_size=_read_flight_recorder_size(),
+        rate_limits=tuple(
+            parse_rate_limits(
+                get_env_variable("PLUGIN_RATE_LIMITS", "")
+            ).items()
+        ),
+        prewarm_hosts=_read_prewarm_hosts(),
+        process_count=_read_process_count(),
+        python_executable=get_env_variable("PLUGIN_PYTHON_EXECUTABLE") or None,
+        profile=get_env_variable(ENV_VARIABLE_PROFILE),
+    )
+
+
+def get_settings() -> PluginSettings:
+    """Get settings snapshot. Settings are read on the first call only.
+
+    Returns:
+        PluginSettings: settings snapshot
+    """
+    global _settings  # noqa: PLW0603
+
+    settings = _settings
+    if settings is not None:
+        return settings
+
+    with _lock:
+        if _settings is None:
+            _settings = load_settings()
+        return _settings
+
+
+def refresh_settings() -> PluginSettings:
+    """Read settings again and notify subscribers if they changed.
+
+    Connect this to a signal that is emitted when settings change, e.g.
+    QgisInterface.optionsChanged.
+
+    Returns:
+        PluginSettings: new settings snapshot
+    """
+    global _settings  # noqa: PLW0603
+
+    with _lock:
+        previous = _settings
+        _settings = load_settings()
+        settings = _settings
+        subscribers = list(_subscribers)
+
+    if settings != previous:
+        for subscriber in subscribers:
+            subscriber(settings)
+
+    return settings
+
+
+def subscribe(subscriber: SettingsSubscriber) -> None:
+    """Call subscriber with new settings whenever settings change.
+
+    Args:
+        subscriber (SettingsSubscriber): callback for new settings
+    """
+    with _lock:
+        if subscriber not in _subscribers:
+            _subscribers.append(subscriber)
+
+
+def unsubscribe(subscriber: SettingsSubscriber) -> None:
+    """Stop notifying subscriber about settings changes.
+
+    Args:
+        subscriber (SettingsSubscriber): subscribed callback
+    """
+    with _lock:
+        if subscriber in _subscribers:
+            _subscribers.remove(subscriber)
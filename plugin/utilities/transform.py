@@ -0,0 +1,505 @@
+"""Bulk coordinate transformation of geometries with NumPy arrays."""
+
+import math
+import struct
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice, product
+from typing import NamedTuple
+
+import numpy as np
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
+    QgsCoordinateTransformContext,
+    QgsCsException,
+    QgsFeature,
+    QgsGeometry,
+    QgsProject,
+)
+
+from plugin.utilities.logger import get_plugin_logger
+
+try:
+    from pyproj import Transformer
+
+    HAS_PYPROJ = True
+except ImportError:
+    HAS_PYPROJ = False
+
+LOG = get_plugin_logger()
+
+TARGET_CRS_ID = "EPSG:3067"
+DEFAULT_BATCH_SIZE = 50_000
+SAMPLE_TOLERANCE = 1e-6
+
+WKB_LITTLE_ENDIAN = 1
+EWKB_Z_FLAG = 0x80000000
+EWKB_M_FLAG = 0x40000000
+
+POINT_TYPES = {1}
+POINT_LIST_TYPES = {2, 8}  # LineString, CircularString
+RING_LIST_TYPES = {3, 17}  # Polygon, Triangle
+COLLECTION_TYPES = {4, 5, 6, 7, 9, 10, 11, 12, 15, 16}
+
+
+def _read_coordinate_blocks(
+    wkb: bytes | bytearray,
+    offset: int,
+    starts: list[int],
+    counts: list[int],
+    dimensions: list[int],
+) -> int:
+    """Collect coordinate blocks of a single WKB geometry.
+
+    Args:
+        wkb (bytes | bytearray): WKB buffer
+        offset (int): offset of the geometry in the buffer
+        starts (list[int]): list to append block byte offsets to
+        counts (list[int]): list to append block vertex counts to
+        dimensions (list[int]): list to append block dimensions to
+
+    Raises:
+        ValueError: raised if geometry is not little endian or geometry type
+            is not supported
+
+    Returns:
+        int: offset of the first byte after the geometry
+    """
+    if wkb[offset] != WKB_LITTLE_ENDIAN:
+        msg = "Only little endian WKB is supported"
+        raise ValueError(msg)
+
+    (type_code,) = struct.unpack_from("<I", wkb, offset + 1)
+    offset += 5
+
+    has_z = bool(type_code & EWKB_Z_FLAG)
+    has_m = bool(type_code & EWKB_M_FLAG)
+    dimension_code, base_type = divmod(type_code & 0x0FFFFFFF, 1000)
+    has_z = has_z or dimension_code in (1, 3)
+    has_m = has_m or dimension_code in (2, 3)
+    dimension = 2 + has_z + has_m
+
+    if base_type in POINT_TYPES:
+        starts.append(offset)
+        counts.append(1)
+        dimensions.append(dimension)
+        return offset + 8 * dimension
+
+    if base_type in POINT_LIST_TYPES:
+        (count,) = struct.unpack_from("<I", wkb, offset)
+        offset += 4
+        starts.append(offset)
+        counts.append(count)
+        dimensions.append(dimension)
+        return offset + 8 * dimension * count
+
+    if base_type in RING_LIST_TYPES:
+        (ring_count,) = struct.unpack_from("<I", wkb, offset)
+        offset += 4
+        for _ in range(ring_count):
+            (count,) = struct.unpack_from("<I", wkb, offset)
+            offset += 4
+            starts.append(offset)
+            counts.append(count)
+            dimensions.append(dimension)
+            offset += 8 * dimension * count
+        return offset
+
+    if base_type in COLLECTION_TYPES:
+        (part_count,) = struct.unpack_from("<I", wkb, offset)
+        offset += 4
+        for _ in range(part_count):
+            offset = _read_coordinate_blocks(
+                wkb, offset, starts, counts, dimensions
+            )
+        return offset
+
+    msg = f"Unsupported WKB geometry type {type_code}"
+    raise ValueError(msg)
+
+
+class CoordinateBlocks(NamedTuple):
+    """Coordinate blocks of WKB geometries.
+
+    Block i has counts[i] vertices of dimensions[i] doubles starting at
+    byte offset starts[i] and it belongs to geometry geometries[i].
+    """
+
+    starts: np.ndarray
+    counts: np.ndarray
+    dimensions: np.ndarray
+    geometries: np.ndarray
+
+
+def get_coordinate_blocks(
+    wkb: bytes | bytearray, geometry_offsets: Iterable[int]
+) -> CoordinateBlocks:
+    """Get coordinate blocks of a buffer of WKB geometries.
+
+    Only geometry and ring headers are parsed in Python. Coordinates of a
+    block can be read as a single array without copying, see
+    get_coordinate_views.
+
+    Args:
+        wkb (bytes | bytearray): buffer of concatenated WKB geometries
+        geometry_offsets (Iterable[int]): offset of each geometry in the
+            buffer
+
+    Raises:
+        ValueError: raised if geometry type is not supported or coordinates
+            are outside the buffer
+        struct.error: raised if geometry headers are truncated
+
+    Returns:
+        CoordinateBlocks: coordinate blocks of the geometries
+    """
+    starts: list[int] = []
+    counts: list[int] = []
+    dimensions: list[int] = []
+    geometries: list[int] = []
+
+    for index, offset in enumerate(geometry_offsets):
+        _read_coordinate_blocks(wkb, offset, starts, counts, dimensions)
+        geometries.extend([index] * (len(starts) - len(geometries)))
+
+    blocks = CoordinateBlocks(
+        np.asarray(starts, dtype=np.int64),
+        np.asarray(counts, dtype=np.int64),
+        np.asarray(dimensions, dtype=np.int64),
+        np.asarray(geometries, dtype=np.int64),
+    )
+    ends = blocks.starts + blocks.counts * blocks.dimensions * 8
+    if len(ends) and ends.max() > len(wkb):
+        msg = "Truncated WKB coordinates"
+        raise ValueError(msg)
+
+    return blocks
+
+
+def get_coordinate_views(
+    wkb: bytes | bytearray, blocks: CoordinateBlocks
+) -> list[np.ndarray]:
+    """Get coordinates of each block as an array sharing the WKB buffer.
+
+    Args:
+        wkb (bytes | bytearray): buffer of concatenated WKB geometries.
+            Views of a bytearray are writable.
+        blocks (CoordinateBlocks): coordinate blocks of the buffer
+
+    Returns:
+        list[np.ndarray]: arrays with shape (count, dimension)
+    """
+    return [
+        np.frombuffer(
+            wkb, dtype="<f8", count=count * dimension, offset=start
+        ).reshape(-1, dimension)
+        for start, count, dimension in zip(
+            blocks.starts.tolist(),
+            blocks.counts.tolist(),
+            blocks.dimensions.tolist(),
+            strict=True,
+        )
+    ]
+
+
+def transform_geometries_per_feature(
+    geometries: Iterable[QgsGeometry],
+    transform: QgsCoordinateTransform,
+    errors: dict[int, QgsCsException] | None = None,
+) -> list[QgsGeometry]:
+    """Transform geometries one by one with QgsCoordinateTransform.
+
+    Args:
+        geometries (Iterable[QgsGeometry]): geometries to transform
+        transform (QgsCoordinateTransform): coordinate transform
+        errors (dict[int, QgsCsException] | None, optional): failures are
+            stored here by geometry index instead of raised.
+            Defaults to None.
+
+    Raises:
+        QgsCsException: raised if a geometry cannot be transformed and
+            errors is None
+
+    Returns:
+        list[QgsGeometry]: transformed geometries
+    """
+    return [
+        _transform_geometry(geometry, transform, i, errors)
+        for i, geometry in enumerate(geometries)
+    ]
+
+
+def _transform_geometry(
+    geometry: QgsGeometry,
+    transform: QgsCoordinateTransform,
+    index: int,
+    errors: dict[int, QgsCsException] | None,
+) -> QgsGeometry:
+    geometry_copy = QgsGeometry(geometry)
+    try:
+        geometry_copy.transform(transform)
+    except QgsCsException as e:
+        if errors is None:
+            raise
+        errors[index] = e
+
+    return geometry_copy
+
+
+class BulkTransformer:
+    """Transform geometries in batches with a single vectorized call.
+
+    Coordinates of a batch of geometries are extracted from their WKB into
+    NumPy arrays, transformed with one pyproj call and written back into the
+    WKB buffer from which the geometries are rebuilt. The pyproj transformer
+    uses the coordinate operation QGIS chose from the transform context and
+    it is verified against QgsCoordinateTransform on a sample point. If
+    pyproj is not available or the results differ, geometries are
+    transformed one by one with QgsCoordinateTransform. Only x and y
+    coordinates are transformed.
+    """
+
+    def __init__(
+        self,
+        source_crs: QgsCoordinateReferenceSystem,
+        destination_crs: QgsCoordinateReferenceSystem | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        transform_context: QgsCoordinateTransformContext | None = None,
+    ) -> None:
+        """Initialize the transformer.
+
+        Args:
+            source_crs (QgsCoordinateReferenceSystem): CRS of the input
+            destination_crs (QgsCoordinateReferenceSystem | None, optional):
+                CRS of the output. Defaults to EPSG:3067.
+            batch_size (int, optional): number of geometries transformed
+                with a single call. Defaults to DEFAULT_BATCH_SIZE.
+            transform_context (QgsCoordinateTransformContext | None,
+                optional): context choosing the coordinate operation.
+                Defaults to transform context of the current project.
+        """
+        if destination_crs is None:
+            destination_crs = QgsCoordinateReferenceSystem(TARGET_CRS_ID)
+        if transform_context is None:
+            transform_context = QgsProject.instance().transformContext()
+
+        self.batch_size = batch_size
+        self.transform = QgsCoordinateTransform(
+            source_crs, destination_crs, transform_context
+        )
+
+        self._transformer: Transformer | None = None
+        self._swap_input = False
+        self._swap_output = False
+        if not HAS_PYPROJ:
+            LOG.debug("pyproj not available, transforming per feature")
+            return
+
+        operation = self.transform.coordinateOperation()
+        try:
+            if operation:
+                transformer = Transformer.from_pipeline(operation)
+            else:
+                transformer = Transformer.from_crs(
+                    source_crs.authid() or source_crs.toWkt(),
+                    destination_crs.authid() or destination_crs.toWkt(),
+                    always_xy=True,
+                )
+        except RuntimeError:  # pyproj.exceptions.ProjError
+            LOG.debug("pyproj cannot create %s", operation or "transform")
+            return
+
+        axis_order = self._match_axis_order(transformer, transform_context)
+        if axis_order is None:
+            LOG.debug(
+                "pyproj result could not be matched with coordinate "
+                "operation %s, transforming per feature",
+                operation or "default",
+            )
+            return
+
+        self._transformer = transformer
+        self._swap_input, self._swap_output = axis_order
+
+    def _match_axis_order(
+        self,
+        transformer: "Transformer",
+        transform_context: QgsCoordinateTransformContext,
+    ) -> tuple[bool, bool] | None:
+        """Find axis order with which pyproj gives the same result as
+        QgsCoordinateTransform for a point in the source CRS area of use.
+
+        PROJ strings of coordinate operations may use the axis order of the
+        CRS authority, e.g. latitude first, instead of x and y.
+
+        Args:
+            transformer (Transformer): pyproj transformer
+            transform_context (QgsCoordinateTransformContext): transform
+                context
+
+        Returns:
+            tuple[bool, bool] | None: whether input and output axes are
+                swapped or None if results do not match or there is no
+                sample point
+        """
+        source_crs = self.transform.sourceCrs()
+        bounds = source_crs.bounds()
+        if bounds.isEmpty():
+            return None
+
+        try:
+            sample = QgsCoordinateTransform(
+                QgsCoordinateReferenceSystem("EPSG:4326"),
+                source_crs,
+                transform_context,
+            ).transform(bounds.center())
+            expected = self.transform.transform(sample)
+        except QgsCsException:
+            return None
+
+        for swap_input, swap_output in product((False, True), repeat=2):
+            point = (sample.x(), sample.y())
+            x, y = transformer.transform(
+                *(point[::-1] if swap_input else point)
+            )
+            if swap_output:
+                x, y = y, x
+            if math.isclose(
+                x, expected.x(), abs_tol=SAMPLE_TOLERANCE
+            ) and math.isclose(y, expected.y(), abs_tol=SAMPLE_TOLERANCE):
+                return swap_input, swap_output
+
+        return None
+
+    def transform_geometries(
+        self, geometries: Iterable[QgsGeometry]
+    ) -> list[QgsGeometry]:
+        """Transform geometries to the destination CRS.
+
+        Args:
+            geometries (Iterable[QgsGeometry]): geometries to transform
+
+        Returns:
+            list[QgsGeometry]: transformed geometries in the input order
+        """
+        transformed: list[QgsGeometry] = []
+
+        iterator = iter(geometries)
+        while batch := list(islice(iterator, self.batch_size)):
+            transformed.extend(self._transform_batch(batch))
+
+        return transformed
+
+    def transform_features(
+        self,
+        features: Iterable[QgsFeature],
+        on_error: Callable[[QgsFeature, QgsCsException], None] | None = None,
+    ) -> Iterator[QgsFeature]:
+        """Transform feature geometries to the destination CRS in place.
+
+        Args:
+            features (Iterable[QgsFeature]): features to transform
+            on_error (Callable[[QgsFeature, QgsCsException], None] | None,
+                optional): called with features that cannot be transformed,
+                which are then left out of the output. Defaults to None,
+                which raises QgsCsException instead.
+
+        Yields:
+            Iterator[QgsFeature]: features with transformed geometries
+        """
+        iterator = iter(features)
+        while batch := list(islice(iterator, self.batch_size)):
+            errors: dict[int, QgsCsException] | None = (
+                None if on_error is None else {}
+            )
+            geometries = self._transform_batch(
+                [feature.geometry() for feature in batch], errors
+            )
+            for i, (feature, geometry) in enumerate(
+                zip(batch, geometries, strict=True)
+            ):
+                if on_error is not None and errors and i in errors:
+                    on_error(feature, errors[i])
+                    continue
+                feature.setGeometry(geometry)
+                yield feature
+
+    def _transform_batch(
+        self,
+        geometries: list[QgsGeometry],
+        errors: dict[int, QgsCsException] | None = None,
+    ) -> list[QgsGeometry]:
+        if self._transformer is None:
+            return transform_geometries_per_feature(
+                geometries, self.transform, errors
+            )
+
+        buffer = bytearray()
+        geometry_offsets: list[int] = []
+        indices: list[int] = []
+        for i, geometry in enumerate(geometries):
+            if geometry.isNull():
+                continue
+            geometry_offsets.append(len(buffer))
+            indices.append(i)
+            buffer += bytes(geometry.asWkb())
+        geometry_offsets.append(len(buffer))
+
+        if not indices:
+            return [QgsGeometry(geometry) for geometry in geometries]
+
+        try:
+            blocks = get_coordinate_blocks(buffer, geometry_offsets[:-1])
+        except (ValueError, struct.error):
+            LOG.debug("Unsupported WKB in batch, transforming per feature")
+            return transform_geometries_per_feature(
+                geometries, self.transform, errors
+            )
+
+        views = get_coordinate_views(buffer, blocks)
+        if not views:
+            return [QgsGeometry(geometry) for geometry in geometries]
+
+        xy = np.concatenate([view[:, :2] for view in views])
+        axes = (1, 0) if self._swap_input else (0, 1)
+        result = self._transformer.transform(xy[:, axes[0]], xy[:, axes[1]])
+        axes = (1, 0) if self._swap_output else (0, 1)
+        x = np.asarray(result[axes[0]], dtype="<f8")
+        y = np.asarray(result[axes[1]], dtype="<f8")
+
+        # Failed points are returned as inf, transform those geometries
+        # per feature so that failures raise QgsCsException on both paths
+        finite = np.isfinite(x) & np.isfinite(y)
+        failed = set()
+        if not finite.all():
+            failed = set(
+                np.repeat(blocks.geometries, blocks.counts)[~finite].tolist()
+            )
+
+        position = 0
+        for view in views:
+            count = len(view)
+            view[:, 0] = x[position : position + count]
+            view[:, 1] = y[position : position + count]
+            position += count
+
+        transformed = [QgsGeometry(geometry) for geometry in geometries]
+        for batch_index, (i, start, end) in enumerate(
+            zip(
+                indices,
+                geometry_offsets[:-1],
+                geometry_offsets[1:],
+                strict=True,
+            )
+        ):
+            if batch_index in failed:
+                transformed[i] = _transform_geometry(
+                    geometries[i], self.transform, i, errors
+                )
+                continue
+
+            geometry = QgsGeometry()
+            geometry.fromWkb(bytes(buffer[start:end]))
+            transformed[i] = geometry
+
+        return transformed
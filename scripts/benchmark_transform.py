@@ -0,0 +1,92 @@
+"""Benchmark bulk coordinate transformation against the per-feature path.
+
+Run with the Python interpreter of the QGIS installation from the project
+root folder, e.g.
+
+    python scripts/benchmark_transform.py --vertices 1000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+from qgis.core import (
+    QgsApplication,
+    QgsCoordinateReferenceSystem,
+    QgsGeometry,
+    QgsLineString,
+    QgsPoint,
+)
+
+sys.path.insert(0, str(Path(__file__).absolute().parent.parent))
+
+from plugin.utilities.transform import (
+    BulkTransformer,
+    transform_geometries_per_feature,
+)
+
+
+def create_geometries(
+    vertex_count: int, vertices_per_geometry: int
+) -> list[QgsGeometry]:
+    """Create random WGS84 linestrings covering Finland.
+
+    Args:
+        vertex_count (int): total number of vertices
+        vertices_per_geometry (int): number of vertices in each geometry
+
+    Returns:
+        list[QgsGeometry]: generated geometries
+    """
+    rng = random.Random(0)  # noqa: S311
+    geometries = []
+    for _ in range(vertex_count // vertices_per_geometry):
+        points = [
+            QgsPoint(rng.uniform(20, 31), rng.uniform(60, 70))
+            for _ in range(vertices_per_geometry)
+        ]
+        geometries.append(QgsGeometry(QgsLineString(points)))
+
+    return geometries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vertices", type=int, default=1_000_000)
+    parser.add_argument("--vertices-per-geometry", type=int, default=100)
+    args = parser.parse_args()
+
+    app = QgsApplication([], False)
+    app.initQgis()
+
+    geometries = create_geometries(args.vertices, args.vertices_per_geometry)
+    transformer = BulkTransformer(QgsCoordinateReferenceSystem("EPSG:4326"))
+
+    start = time.perf_counter()
+    expected = transform_geometries_per_feature(
+        geometries, transformer.transform
+    )
+    per_feature_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = transformer.transform_geometries(geometries)
+    bulk_seconds = time.perf_counter() - start
+
+    max_difference = max(
+        a.hausdorffDistance(b) for a, b in zip(expected, result, strict=True)
+    )
+
+    print(f"geometries:        {len(geometries)}")
+    print(f"vertices:          {args.vertices}")
+    print(f"per-feature:       {per_feature_seconds:.3f} s")
+    print(f"bulk:              {bulk_seconds:.3f} s")
+    print(f"speedup:           {per_feature_seconds / bulk_seconds:.1f}x")
+    print(f"max difference:    {max_difference:.6f} m")
+
+    app.exitQgis()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+#!/usr/bin/env bash
+
+echo "Compiling resources"
+
+# get path to the plugin directory (while resolving symlinks)
+PLUGIN_DIR=$(dirname $(dirname $(realpath $0)))
+
+# rcc is packaged under different names depending on the Qt installation
+if command -v rcc-qt5 &>/dev/null; then
+    RCC=rcc-qt5
+else
+    RCC=rcc
+fi
+
+$RCC -binary $PLUGIN_DIR/plugin/resources.qrc -o $PLUGIN_DIR/plugin/resources/resources.rcc
@@ -0,0 +1,145 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsFeature,
+    QgsField,
+    QgsFields,
+    QgsGeometry,
+    QgsRectangle,
+    QgsWkbTypes,
+)
+from qgis.PyQt.QtCore import QVariant
+
+from plugin.utilities.feature_cache import (
+    CacheTile,
+    FeatureCache,
+    TimeRange,
+    get_tile_count,
+    get_tiles_for_extent,
+    get_time_buckets,
+    merge_tile_runs,
+)
+
+
+def test_tiles_for_extent_are_grid_aligned() -> None:
+    tiles = get_tiles_for_extent(QgsRectangle(-500, 100, 1500, 900), 1000)
+
+    assert tiles == [CacheTile(-1, 0), CacheTile(0, 0), CacheTile(1, 0)]
+    assert get_tile_count(QgsRectangle(-500, 100, 1500, 900), 1000) == 3
+
+
+def test_time_buckets_cover_time_range() -> None:
+    time_range = TimeRange(
+        datetime(2024, 1, 1, 12, tzinfo=UTC),
+        datetime(2024, 1, 2, 6, tzinfo=UTC),
+    )
+
+    buckets = get_time_buckets(time_range, timedelta(days=1))
+
+    assert buckets == [
+        TimeRange(
+            datetime(2024, 1, 1, tzinfo=UTC),
+            datetime(2024, 1, 2, tzinfo=UTC),
+        ),
+        TimeRange(
+            datetime(2024, 1, 2, tzinfo=UTC),
+            datetime(2024, 1, 3, tzinfo=UTC),
+        ),
+    ]
+
+
+def test_adjacent_tiles_are_merged_into_runs() -> None:
+    tiles = [
+        CacheTile(0, 0),
+        CacheTile(2, 0),
+        CacheTile(1, 0),
+        CacheTile(0, 1),
+    ]
+
+    assert merge_tile_runs(tiles) == [
+        [CacheTile(0, 0), CacheTile(1, 0), CacheTile(2, 0)],
+        [CacheTile(0, 1)],
+    ]
+
+
+def _create_cache(
+    tmp_path: Path,
+    fetched: list[QgsRectangle],
+    layer_name: str = "cache",
+    **kwargs: Any,
+) -> FeatureCache:
+    fields = QgsFields()
+    fields.append(QgsField("remote_id", QVariant.String))
+
+    def fetcher(
+        extent: QgsRectangle, _time_range: TimeRange | None
+    ) -> list[QgsFeature]:
+        fetched.append(extent)
+        feature = QgsFeature(fields)
+        feature["remote_id"] = "a"
+        feature.setGeometry(QgsGeometry.fromPointXY(extent.center()))
+        return [feature]
+
+    return FeatureCache(
+        tmp_path / "cache.gpkg",
+        layer_name,
+        fields,
+        QgsWkbTypes.Point,
+        QgsCoordinateReferenceSystem("EPSG:3067"),
+        fetcher,
+        id_field="remote_id",
+        **kwargs,
+    )
+
+
+def test_cache_fetches_only_missing_tiles(tmp_path: Path) -> None:
+    fetched: list[QgsRectangle] = []
+    cache = _create_cache(tmp_path, fetched)
+
+    cache.sync(QgsRectangle(0, 0, 2000, 1000))
+    cache.sync(QgsRectangle(0, 0, 3000, 1000))
+
+    assert fetched == [
+        QgsRectangle(0, 0, 2000, 1000),
+        QgsRectangle(2000, 0, 3000, 1000),
+    ]
+    assert cache.get_missing_tiles(QgsRectangle(0, 0, 3000, 1000)) == []
+
+
+def test_stale_tiles_are_refetched_and_replaced(tmp_path: Path) -> None:
+    fetched: list[QgsRectangle] = []
+    cache = _create_cache(tmp_path, fetched, max_age=timedelta(0))
+    extent = QgsRectangle(0, 0, 1000, 1000)
+
+    cache.sync(extent)
+    cache.sync(extent)
+
+    assert len(fetched) == 2
+    assert len(list(cache.read_features(extent))) == 1
+
+
+def test_large_extent_is_fetched_directly(tmp_path: Path) -> None:
+    fetched: list[QgsRectangle] = []
+    cache = _create_cache(tmp_path, fetched, max_tiles=1)
+    extent = QgsRectangle(0, 0, 2000, 1000)
+
+    cache.sync(extent)
+
+    assert fetched == [extent]
+    assert len(cache.get_missing_tiles(extent)) == 2
+
+
+def test_invalidate_keeps_tiles_of_other_layers(tmp_path: Path) -> None:
+    extent = QgsRectangle(0, 0, 1000, 1000)
+    first = _create_cache(tmp_path, [], "first")
+    second = _create_cache(tmp_path, [], "second")
+    first.sync(extent)
+    second.sync(extent)
+
+    first.invalidate()
+
+    assert first.get_missing_tiles(extent) == [CacheTile(0, 0)]
+    assert second.get_missing_tiles(extent) == []
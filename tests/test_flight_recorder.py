@@ -0,0 +1,73 @@
+import logging
+from pathlib import Path
+
+from plugin.utilities.flight_recorder import FlightRecorderHandler
+
+
+def test_error_dumps_latest_records(tmp_path: Path) -> None:
+    dump_path = tmp_path / "flight-recorder.log"
+    logger = logging.getLogger("test_flight_recorder")
+    logger.setLevel(logging.DEBUG)
+    handler = FlightRecorderHandler(capacity=3, dump_path=dump_path)
+    logger.addHandler(handler)
+
+    try:
+        for i in range(5):
+            logger.debug("debug %d", i)
+        assert not dump_path.exists()
+
+        logger.error("failure")
+        logger.error("second failure")
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    lines = dump_path.read_text("utf-8").splitlines()
+    messages = [line.rsplit(" - ", 1)[-1] for line in lines]
+    assert messages[1:4] == ["debug 3", "debug 4", "failure"]
+    assert messages[5:] == ["second failure"]
+
+
+class BrokenStr:
+    def __str__(self) -> str:
+        raise ValueError
+
+
+def test_bad_format_args_do_not_break_logging(tmp_path: Path) -> None:
+    dump_path = tmp_path / "flight-recorder.log"
+    handler = FlightRecorderHandler(capacity=3, dump_path=dump_path)
+    handler.handleError = lambda _: None  # type: ignore[method-assign]
+
+    handler.handle(_create_record("value %s %s", ("only one",)))
+    handler.handle(_create_record("value %s", (BrokenStr(),)))
+    handler.handle(_create_record("failure", None, logging.ERROR))
+    handler.close()
+
+    lines = dump_path.read_text("utf-8").splitlines()
+    assert "Failed to format record" in lines[1]
+    assert lines[2].endswith(" - failure")
+
+
+def test_non_primitive_args_are_formatted_when_stored(tmp_path: Path) -> None:
+    handler = FlightRecorderHandler(
+        capacity=3, dump_path=tmp_path / "flight-recorder.log"
+    )
+    values = [1, 2]
+    record = _create_record("values %s %d", (values, 3))
+
+    handler.handle(record)
+    values.append(4)
+
+    stored = handler.records[0]
+    assert stored.getMessage() == "values [1, 2] 3"
+    assert stored.args is None
+    assert record.args == (values, 3)
+    handler.close()
+
+
+def _create_record(
+    msg: str, args: tuple | None, level: int = logging.DEBUG
+) -> logging.LogRecord:
+    return logging.LogRecord(
+        "test_flight_recorder", level, __file__, 1, msg, args, None
+    )
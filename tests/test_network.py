@@ -0,0 +1,141 @@
+import threading
+import time
+from collections.abc import Callable
+
+import pytest
+
+from plugin.exceptions import NetworkException
+from plugin.utilities import network
+from plugin.utilities.rate_limiter import RequestPriority
+
+URL = "https://example.com"
+
+
+def _wait_until(condition: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_identical_get_requests_share_one_request(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    release = threading.Event()
+    requested_urls: list[str] = []
+    waiting: list[network.InFlightRequest] = []
+
+    def request_raw(url: str, *_args: object, **_kwargs: object) -> bytes:
+        requested_urls.append(url)
+        release.wait(5)
+        return b"content"
+
+    original_wait = network.InFlightRequest.wait
+
+    def wait(self: network.InFlightRequest) -> bytes:
+        waiting.append(self)
+        return original_wait(self)
+
+    monkeypatch.setattr(network, "request_raw", request_raw)
+    monkeypatch.setattr(network.InFlightRequest, "wait", wait)
+
+    results: list[bytes] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(network.get(URL)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: len(waiting) == 4)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert requested_urls == [URL]
+    assert results == [b"content"] * 5
+
+
+def test_main_thread_does_not_wait_for_request_in_progress(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    leader = _create_in_flight_request(RequestPriority.INTERACTIVE)
+    monkeypatch.setattr(
+        network,
+        "_in_flight_requests",
+        {network.get_request_key("get", URL): leader},
+    )
+    monkeypatch.setattr(network, "request_raw", lambda *_, **__: b"own")
+
+    assert network.get(URL) == b"own"
+
+
+def test_higher_priority_request_is_not_queued_behind_lower(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    key = network.get_request_key("get", URL)
+    leader = _create_in_flight_request(RequestPriority.BACKGROUND)
+    in_flight_requests = {key: leader}
+    monkeypatch.setattr(network, "_in_flight_requests", in_flight_requests)
+
+    sent: list[tuple[RequestPriority, network.InFlightRequest]] = []
+
+    def request_raw(
+        *_args: object, priority: RequestPriority, **_: object
+    ) -> bytes:
+        sent.append((priority, in_flight_requests[key]))
+        return b"content"
+
+    monkeypatch.setattr(network, "request_raw", request_raw)
+
+    results: list[bytes] = []
+    thread = threading.Thread(
+        target=lambda: results.append(
+            network.get(URL, priority=RequestPriority.INTERACTIVE)
+        )
+    )
+    thread.start()
+    thread.join(5)
+
+    assert results == [b"content"]
+    assert sent[0][0] == RequestPriority.INTERACTIVE
+    assert sent[0][1] is not leader
+    assert sent[0][1].priority == RequestPriority.INTERACTIVE
+    assert in_flight_requests == {}
+
+
+def test_waiting_requests_get_the_error() -> None:
+    class KeywordError(Exception):
+        def __init__(self, *, code: int) -> None:
+            super().__init__(f"failed with {code}")
+
+    in_flight = network.InFlightRequest()
+    error = KeywordError(code=1)
+    in_flight.set_error(error)
+
+    with pytest.raises(NetworkException, match="failed with 1") as info:
+        in_flight.wait()
+    assert info.value.__cause__ is error
+
+
+def test_waiting_requests_get_network_error_details() -> None:
+    in_flight = network.InFlightRequest()
+    in_flight.set_error(
+        NetworkException("failed", error=5, bar_msg={"message": "timeout"})
+    )
+
+    with pytest.raises(NetworkException) as info:
+        in_flight.wait()
+    assert info.value.error == 5
+    assert info.value.bar_msg == {"message": "timeout"}
+
+
+def _create_in_flight_request(
+    priority: RequestPriority,
+) -> network.InFlightRequest:
+    # request in progress on another thread
+    in_flight: list[network.InFlightRequest] = []
+    thread = threading.Thread(
+        target=lambda: in_flight.append(network.InFlightRequest(priority))
+    )
+    thread.start()
+    thread.join(5)
+    return in_flight[0]
@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+from qgis.PyQt.QtCore import QUrl
+from qgis.PyQt.QtNetwork import QNetworkRequest
+
+from plugin.utilities import network_session
+from plugin.utilities.network_session import (
+    NetworkSession,
+    PrewarmTarget,
+    SessionStats,
+    parse_prewarm_target,
+)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("api.example.com", PrewarmTarget("api.example.com", 443, True)),
+        (
+            "http://tiles.example.com:8080",
+            PrewarmTarget("tiles.example.com", 8080, False),
+        ),
+        ("ftp://files.example.com", None),
+    ],
+)
+def test_parse_prewarm_target(
+    value: str, expected: PrewarmTarget | None
+) -> None:
+    assert parse_prewarm_target(value) == expected
+
+
+def test_reuse_ratio() -> None:
+    assert SessionStats(0, 0, 0, 0).reuse_ratio is None
+    assert SessionStats(5, 4, 1, 0).reuse_ratio == 0.75
+    assert SessionStats(2, 2, 3, 0).reuse_ratio == 0.0
+
+
+class FakeReply:
+    def attribute(self, _attribute: object) -> bool:
+        return False
+
+
+def test_main_thread_requests_are_sent_on_session_thread(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    sending_threads: list[int] = []
+
+    class FakeBlockingRequest:
+        def get(self, _req: QNetworkRequest) -> int:
+            sending_threads.append(threading.get_ident())
+            return 0
+
+        def reply(self) -> FakeReply:
+            return FakeReply()
+
+    monkeypatch.setattr(
+        network_session, "QgsBlockingNetworkRequest", FakeBlockingRequest
+    )
+    session = NetworkSession()
+    try:
+        for _ in range(2):
+            session.send(QNetworkRequest(QUrl("https://example.com")))
+    finally:
+        session.close()
+
+    assert len(set(sending_threads)) == 1
+    assert sending_threads[0] != threading.get_ident()
+    assert session.stats().requests == 2
+    assert session.stats().encrypted_requests == 2
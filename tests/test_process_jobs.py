@@ -0,0 +1,86 @@
+import json
+import struct
+
+import numpy as np
+
+from plugin.utilities.process_jobs import (
+    VALID_COLUMN,
+    StringColumn,
+    decode_geojson,
+    read_result,
+    simplify_coordinates,
+    write_result,
+)
+
+FEATURE_COLLECTION = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [25.0, 60.0]},
+            "properties": {"id": 1, "name": "a", "value": 1.5},
+        },
+        {
+            "type": "Feature",
+            "geometry": {
+                "type": "LineString",
+                "coordinates": [[0, 0], [1, 0.01], [2, 0]],
+            },
+            "properties": {"id": 2, "name": None},
+        },
+        {
+            "type": "Feature",
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [[[0, 0], [1, 0], [1, 1]]],
+            },
+            "properties": {"id": 3, "name": "ä", "value": 2, "tags": ["x"]},
+        },
+    ],
+}
+
+
+def test_decode_geojson() -> None:
+    result = decode_geojson(json.dumps(FEATURE_COLLECTION).encode())
+
+    assert len(result) == 3
+    assert result.geometry_wkb(0) == struct.pack("<BIdd", 1, 1, 25.0, 60.0)
+    assert result.attributes["id"].dtype == np.int64
+    assert isinstance(result.attributes["name"], StringColumn)
+    assert result.attributes["name"].tolist() == ["a", None, "ä"]
+    assert result.attributes["name"].data == "aä".encode()
+    assert result.attributes["tags"].tolist() == [None, None, '["x"]']
+    assert np.isnan(result.attributes["value"][1])
+    assert result.attributes[VALID_COLUMN].tolist() == [True, True, False]
+
+
+def test_decode_geojson_simplifies_lines() -> None:
+    result = decode_geojson(
+        json.dumps(FEATURE_COLLECTION).encode(), simplify_tolerance=0.1
+    )
+
+    assert result.geometry_wkb(1) == struct.pack(
+        "<BII4d", 1, 2, 2, 0.0, 0.0, 2.0, 0.0
+    )
+
+
+def test_result_file_round_trip() -> None:
+    result = decode_geojson(json.dumps(FEATURE_COLLECTION).encode())
+
+    copy = read_result(write_result(result))
+
+    assert copy.wkb == result.wkb
+    assert copy.wkb_offsets.tolist() == result.wkb_offsets.tolist()
+    assert copy.attributes.keys() == result.attributes.keys()
+    for name, values in result.attributes.items():
+        if isinstance(values, StringColumn):
+            assert copy.attributes[name].tolist() == values.tolist()
+        else:
+            np.testing.assert_array_equal(copy.attributes[name], values)
+
+
+def test_simplify_keeps_end_points() -> None:
+    line = np.array([[0, 0], [1, 1], [2, 0], [3, 1], [4, 0]], dtype=float)
+
+    assert simplify_coordinates(line, 10).tolist() == [[0, 0], [4, 0]]
+    assert simplify_coordinates(line, 0.5).tolist() == line.tolist()
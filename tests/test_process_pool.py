@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from plugin.utilities import process_pool
+from plugin.utilities.process_jobs import decode_geojson
+from plugin.utilities.process_pool import ProcessPool, get_process_count
+from tests.test_settings import SETTINGS
+
+
+def test_process_count_defaults_to_cpu_count(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        process_pool,
+        "get_settings",
+        lambda: SETTINGS._replace(process_count=None),
+    )
+    monkeypatch.setattr(process_pool.os, "cpu_count", lambda: 3)
+
+    assert get_process_count() == 3
+
+
+def test_jobs_are_run_in_worker_processes() -> None:
+    payloads = [
+        json.dumps(
+            {
+                "features": [
+                    {"geometry": None, "properties": {"name": f"feature {i}"}}
+                ]
+            }
+        ).encode()
+        for i in range(3)
+    ]
+    pool = ProcessPool(max_workers=2)
+
+    try:
+        results = list(pool.map(decode_geojson, payloads))
+    finally:
+        pool.shutdown()
+
+    assert [r.attributes["name"].tolist() for r in results] == [
+        ["feature 0"],
+        ["feature 1"],
+        ["feature 2"],
+    ]
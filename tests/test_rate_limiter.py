@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+
+from plugin.utilities.rate_limiter import (
+    MAX_BLOCK_SECONDS,
+    HostRateLimiter,
+    RateLimit,
+    RequestPriority,
+    parse_rate_limits,
+    parse_retry_after,
+)
+
+HOST = "api.example.com"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bucket_allows_bursts_up_to_capacity() -> None:
+    clock = FakeClock()
+    limiter = HostRateLimiter(RateLimit(1.0, 3.0), clock=clock)
+
+    for _ in range(3):
+        limiter.acquire(HOST, timeout=0)
+    with pytest.raises(TimeoutError):
+        limiter.acquire(HOST, timeout=0)
+
+    clock.now = 1.0
+    limiter.acquire(HOST, timeout=0)
+
+
+def test_retry_after_blocks_host() -> None:
+    clock = FakeClock()
+    limiter = HostRateLimiter(clock=clock)
+
+    limiter.update_from_response(HOST, 429, {"retry-after": "30"})
+
+    assert limiter.quota_state(HOST).blocked_for == 30
+    with pytest.raises(TimeoutError):
+        limiter.acquire(HOST, timeout=0)
+    limiter.acquire("other.example.com", timeout=0)
+
+    clock.now = 30.0
+    limiter.acquire(HOST, timeout=0)
+
+
+def test_long_retry_after_is_capped() -> None:
+    limiter = HostRateLimiter(clock=FakeClock())
+
+    limiter.update_from_response(HOST, 503, {"retry-after": "86400"})
+
+    assert limiter.quota_state(HOST).blocked_for == MAX_BLOCK_SECONDS
+
+
+def test_reset_timestamp_is_relative_to_current_time() -> None:
+    limiter = HostRateLimiter(
+        clock=FakeClock(), wall_clock=lambda: 1760899990.0
+    )
+
+    limiter.update_from_response(
+        HOST,
+        200,
+        {"x-ratelimit-remaining": "0", "x-ratelimit-reset": "1760900000"},
+    )
+
+    state = limiter.quota_state(HOST)
+    assert state.blocked_for == 10
+    assert state.reset_in == 10
+
+
+def test_rate_limit_headers_pace_remaining_quota() -> None:
+    clock = FakeClock()
+    limiter = HostRateLimiter(clock=clock)
+
+    limiter.update_from_response(
+        HOST,
+        200,
+        {
+            "ratelimit-limit": "100",
+            "ratelimit-remaining": "10",
+            "ratelimit-reset": "20",
+        },
+    )
+
+    state = limiter.quota_state(HOST)
+    assert state.limit == 100
+    assert state.remaining == 10
+    assert state.rate == 0.5
+    assert state.reset_in == 20
+
+
+def test_interactive_requests_go_first() -> None:
+    limiter = HostRateLimiter(RateLimit(20.0, 1.0))
+    limiter.acquire(HOST)
+    order: list[RequestPriority] = []
+
+    def acquire(priority: RequestPriority) -> None:
+        limiter.acquire(HOST, priority)
+        order.append(priority)
+
+    threads = [
+        threading.Thread(target=acquire, args=(priority,))
+        for priority in (
+            RequestPriority.BACKGROUND,
+            RequestPriority.BACKGROUND,
+            RequestPriority.INTERACTIVE,
+        )
+    ]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join(5)
+
+    assert order[0] == RequestPriority.INTERACTIVE
+
+
+def test_parse_rate_limits() -> None:
+    assert parse_rate_limits("api.example.com=10:20; *=5;invalid") == {
+        "api.example.com": RateLimit(10.0, 20.0),
+        "*": RateLimit(5.0, 5.0),
+    }
+
+
+def test_parse_retry_after_http_date() -> None:
+    assert (
+        parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470)
+        == 10
+    )
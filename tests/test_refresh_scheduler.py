@@ -0,0 +1,32 @@
+import threading
+
+import pytest
+
+from plugin.exceptions import GenericException
+from plugin.utilities import refresh_scheduler
+
+
+def test_scheduler_must_be_installed_before_use() -> None:
+    refresh_scheduler.uninstall_refresh_scheduler()
+
+    with pytest.raises(GenericException):
+        refresh_scheduler.get_refresh_scheduler()
+
+
+def test_scheduler_is_not_installed_on_worker_thread() -> None:
+    refresh_scheduler.uninstall_refresh_scheduler()
+    errors: list[Exception] = []
+
+    def install() -> None:
+        try:
+            refresh_scheduler.install_refresh_scheduler()
+        except GenericException as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=install)
+    thread.start()
+    thread.join(5)
+
+    assert len(errors) == 1
+    with pytest.raises(GenericException):
+        refresh_scheduler.get_refresh_scheduler()
@@ -0,0 +1,69 @@
+import pytest
+
+from plugin.utilities import settings
+from plugin.utilities.settings import (
+    PluginSettings,
+    get_settings,
+    load_settings,
+    refresh_settings,
+    subscribe,
+    unsubscribe,
+)
+
+SETTINGS = PluginSettings(
+    user_agent="Mozilla/5.0 QGIS/33400 plugin",
+    locale="fi",
+    log_level=20,
+    debugging_enabled=False,
+    file_logging_enabled=False,
+    flight_recorder_size=1000,
+    rate_limits=(),
+    prewarm_hosts=(),
+    process_count=None,
+    python_executable=None,
+    profile=None,
+)
+
+
+@pytest.fixture
+def loaded_settings(monkeypatch: pytest.MonkeyPatch) -> list[PluginSettings]:
+    loaded = [SETTINGS]
+    monkeypatch.setattr(settings, "_settings", None)
+    monkeypatch.setattr(settings, "load_settings", lambda: loaded[-1])
+    return loaded
+
+
+def test_settings_are_loaded_once(
+    loaded_settings: list[PluginSettings],
+) -> None:
+    assert get_settings() is SETTINGS
+
+    loaded_settings.append(SETTINGS._replace(locale="en"))
+
+    assert get_settings() is SETTINGS
+
+
+def test_subscribers_are_notified_on_change(
+    loaded_settings: list[PluginSettings],
+) -> None:
+    notified: list[PluginSettings] = []
+    get_settings()
+    subscribe(notified.append)
+
+    try:
+        refresh_settings()
+        loaded_settings.append(SETTINGS._replace(locale="en"))
+        refresh_settings()
+    finally:
+        unsubscribe(notified.append)
+
+    assert notified == [SETTINGS._replace(locale="en")]
+
+
+@pytest.mark.parametrize("value", ["0", "-2", "invalid"])
+def test_invalid_process_count_is_not_used(
+    monkeypatch: pytest.MonkeyPatch, value: str
+) -> None:
+    monkeypatch.setenv("PLUGIN_PROCESS_COUNT", value)
+
+    assert load_settings().process_count is None
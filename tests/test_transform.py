@@ -0,0 +1,110 @@
+import struct
+
+import numpy as np
+import pytest
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
+    QgsCsException,
+    QgsFeature,
+    QgsGeometry,
+    QgsPointXY,
+    QgsProject,
+)
+
+from plugin.utilities.transform import (
+    TARGET_CRS_ID,
+    BulkTransformer,
+    get_coordinate_blocks,
+    get_coordinate_views,
+)
+
+
+def _linestring_z(coordinates: list[tuple[float, float, float]]) -> bytes:
+    wkb = struct.pack("<BII", 1, 1002, len(coordinates))
+    for coordinate in coordinates:
+        wkb += struct.pack("<ddd", *coordinate)
+    return wkb
+
+
+def _multipolygon(rings: list[list[tuple[float, float]]]) -> bytes:
+    polygon = struct.pack("<BII", 1, 3, len(rings))
+    for ring in rings:
+        polygon += struct.pack("<I", len(ring))
+        for coordinate in ring:
+            polygon += struct.pack("<dd", *coordinate)
+    return struct.pack("<BII", 1, 6, 1) + polygon
+
+
+def test_coordinate_views_of_mixed_geometries() -> None:
+    point = struct.pack("<BIdd", 1, 1, 1.0, 2.0)
+    line = _linestring_z([(3.0, 4.0, 100.0), (5.0, 6.0, 100.0)])
+    polygon = _multipolygon(
+        [[(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 0.0)], [(7.0, 8.0)]]
+    )
+    wkb = bytearray(point + line + polygon)
+
+    blocks = get_coordinate_blocks(
+        wkb, [0, len(point), len(point) + len(line)]
+    )
+    views = get_coordinate_views(wkb, blocks)
+
+    assert blocks.geometries.tolist() == [0, 1, 2, 2]
+    xy = np.concatenate([view[:, :2] for view in views])
+    assert xy[:, 0].tolist() == [1.0, 3.0, 5.0, 0.0, 1.0, 1.0, 0.0, 7.0]
+    assert xy[:, 1].tolist() == [2.0, 4.0, 6.0, 0.0, 0.0, 1.0, 0.0, 8.0]
+
+    views[1][:, 2] = 200.0
+    assert struct.unpack_from("<d", wkb, len(point) + 9 + 16)[0] == 200.0
+
+
+def test_truncated_wkb_is_rejected() -> None:
+    line = _linestring_z([(3.0, 4.0, 100.0), (5.0, 6.0, 100.0)])
+
+    with pytest.raises(ValueError, match="Truncated"):
+        get_coordinate_blocks(line[:-20], [0])
+
+    with pytest.raises(struct.error):
+        get_coordinate_blocks(line[:7], [0])
+
+
+def test_bulk_transform_matches_qgis_and_raises_on_failure() -> None:
+    source_crs = QgsCoordinateReferenceSystem("EPSG:4326")
+    transformer = BulkTransformer(source_crs)
+    transform = QgsCoordinateTransform(
+        source_crs,
+        QgsCoordinateReferenceSystem(TARGET_CRS_ID),
+        QgsProject.instance().transformContext(),
+    )
+
+    (geometry,) = transformer.transform_geometries(
+        [QgsGeometry.fromPointXY(QgsPointXY(25, 60))]
+    )
+    expected = transform.transform(QgsPointXY(25, 60))
+    assert geometry.asPoint().x() == pytest.approx(expected.x())
+    assert geometry.asPoint().y() == pytest.approx(expected.y())
+
+    with pytest.raises(QgsCsException):
+        transformer.transform_geometries(
+            [QgsGeometry.fromPointXY(QgsPointXY(25, 95))]
+        )
+
+
+def test_features_failing_to_transform_are_reported_and_skipped() -> None:
+    transformer = BulkTransformer(QgsCoordinateReferenceSystem("EPSG:4326"))
+    features = []
+    for feature_id, y in enumerate((60, 95, 61)):
+        feature = QgsFeature(feature_id)
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(25, y)))
+        features.append(feature)
+
+    failed: list[int] = []
+    transformed = list(
+        transformer.transform_features(
+            features, on_error=lambda feature, _: failed.append(feature.id())
+        )
+    )
+
+    assert failed == [1]
+    assert [feature.id() for feature in transformed] == [0, 2]
+    assert transformed[1].geometry().asPoint().y() > 6_000_000
@@ -1,5 +1,7 @@
 SOURCES = ./plugin/ui/example_dialog.py \
-          ./plugin/exceptions.py
+          ./plugin/exceptions.py \
+          ./plugin/processing/fetch_url_algorithm.py \
+          ./plugin/processing/transform_layer_algorithm.py
 
 FORMS = ./plugin/ui/example_dialog.ui
 